@@ -0,0 +1,147 @@
+# ==========================================================
+# CORPUS TOKEN STATISTICS (STREAMING + MULTI-PROCESS)
+# ----------------------------------------------------------
+# - The text file is read in chunks of lines, so memory
+#   stays bounded no matter how big the file is.
+# - Chunks are fanned out to a process pool; each worker
+#   runs every tokenizer on its chunk and returns small
+#   partial histograms.
+# - The parent merges the partials into:
+#     tokens per word, vocabulary coverage, the sequence
+#     length histogram and the longest sequences.
+# ==========================================================
+import argparse
+import heapq
+import itertools
+import json
+import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from tokenizer_service import DEFAULT_TOKENIZERS, encode_batch, get_tokenizer, iter_batches, read_documents
+
+TOP_LONGEST = 10  # How many of the longest sequences to keep per tokenizer
+
+
+def new_stats():
+    return {
+        "documents": 0,
+        "words": 0,
+        "tokens": 0,
+        "token_counts": Counter(),   # token id -> occurrences
+        "length_hist": Counter(),    # sequence length -> number of documents
+        "longest": [],               # min-heap of (length, doc_id, preview)
+    }
+
+
+def chunk_stats(start_id, texts, tokenizers):
+    """Worker: partial statistics for one chunk of documents"""
+    words = sum(len(text.split()) for text in texts)
+    partial = {}
+    for key, model_name in tokenizers.items():
+        stats = new_stats()
+        stats["documents"] = len(texts)
+        stats["words"] = words
+
+        for offset, ids in enumerate(encode_batch(model_name, texts)):
+            length = len(ids)
+            stats["tokens"] += length
+            stats["token_counts"].update(ids)
+            stats["length_hist"][length] += 1
+
+            item = (length, start_id + offset, texts[offset][:80])
+            if len(stats["longest"]) < TOP_LONGEST:
+                heapq.heappush(stats["longest"], item)
+            elif item > stats["longest"][0]:
+                heapq.heapreplace(stats["longest"], item)
+
+        partial[key] = stats
+    return partial
+
+
+def merge_stats(total, partial):
+    """Fold one worker's partial statistics into the running totals"""
+    for key, stats in partial.items():
+        merged = total.setdefault(key, new_stats())
+        merged["documents"] += stats["documents"]
+        merged["words"] += stats["words"]
+        merged["tokens"] += stats["tokens"]
+        merged["token_counts"].update(stats["token_counts"])
+        merged["length_hist"].update(stats["length_hist"])
+        merged["longest"] = heapq.nlargest(TOP_LONGEST, merged["longest"] + stats["longest"])
+    return total
+
+
+def summarize(total, tokenizers):
+    """Turn merged statistics into a JSON-friendly report"""
+    report = {}
+    for key, stats in total.items():
+        vocab_size = len(get_tokenizer(tokenizers[key]))
+        report[key] = {
+            "model": tokenizers[key],
+            "documents": stats["documents"],
+            "words": stats["words"],
+            "tokens": stats["tokens"],
+            "tokens_per_word": stats["tokens"] / stats["words"] if stats["words"] else 0.0,
+            "distinct_tokens": len(stats["token_counts"]),
+            "vocab_size": vocab_size,
+            "vocab_coverage": len(stats["token_counts"]) / vocab_size,
+            "length_hist": dict(sorted(stats["length_hist"].items())),
+            "longest": [
+                {"length": length, "doc_id": doc_id, "preview": preview}
+                for length, doc_id, preview in sorted(stats["longest"], reverse=True)
+            ],
+        }
+    return report
+
+
+def corpus_stats(path, tokenizers=None, chunk_size=5000, workers=None):
+    """Stream `path` (one document per line) through a process pool and merge the results"""
+    tokenizers = tokenizers or DEFAULT_TOKENIZERS
+    workers = workers or os.cpu_count()
+    max_pending = 2 * workers  # Cap on chunks held in memory at once
+    total = {}
+
+    chunks = iter_batches(read_documents(path), chunk_size)
+    start_ids = itertools.count(0, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk, start_id in zip(chunks, start_ids):
+            pending.add(pool.submit(chunk_stats, start_id, chunk, tokenizers))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge_stats(total, future.result())
+
+        for future in pending:
+            merge_stats(total, future.result())
+
+    return summarize(total, tokenizers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token statistics for BPE / WordPiece / SentencePiece over a corpus")
+    parser.add_argument("corpus", help="Text file with one document per line")
+    parser.add_argument("--chunk_size", type=int, default=5000, help="Documents per worker task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="corpus_stats.json")
+
+    args = parser.parse_args()
+
+    report = corpus_stats(args.corpus, chunk_size=args.chunk_size, workers=args.workers)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for key, stats in report.items():
+        print(f"\n=== {key} ({stats['model']}) ===")
+        print(f"Tokens per word: {stats['tokens_per_word']:.3f}")
+        print(f"Vocabulary coverage: {stats['distinct_tokens']}/{stats['vocab_size']} "
+              f"({stats['vocab_coverage']:.2%})")
+        if stats["longest"]:
+            print(f"Longest sequence: {stats['longest'][0]['length']} tokens (doc {stats['longest'][0]['doc_id']})")
+    print(f"\nFull report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
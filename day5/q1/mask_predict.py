@@ -8,13 +8,14 @@
 #   comment on their plausibility.
 # ===========================================================
 
-# STEP 1: Import the required Hugging Face transformers pipeline
-from transformers import pipeline
+# STEP 1: Import the batched mask filler (wraps BERT + tokenizer)
+from mask_service import MaskFiller
 
-# STEP 2: Create the fill-mask pipeline using the BERT model
-# - "fill-mask" is a special pipeline for mask prediction.
+# STEP 2: Create the mask filler using the BERT model
+# - Works like the "fill-mask" pipeline, but scores many
+#   sentences per forward pass and caches the results.
 # - "bert-base-uncased" is a popular model trained for masked LM.
-mask_filler = pipeline("fill-mask", model="bert-base-uncased")
+mask_filler = MaskFiller(model_name="bert-base-uncased")
 
 # STEP 3: Create your masked sentence.
 # Here, we've replaced "mat" and "tired" with [MASK].
@@ -22,16 +23,21 @@ masked_sentence = "The cat sat on the [MASK] because it was [MASK]."
 
 # STEP 4: Get the fill-mask results.
 # IMPORTANT:
-# The pipeline returns a list of results for EACH mask position.
-results = mask_filler(masked_sentence, top_k=3)
+# fill() takes a LIST of sentences and returns, for each one,
+# a list of results for EACH mask position.
+results = mask_filler.fill([masked_sentence], top_k=3)[0]
 
 # STEP 5: Interpret Results
-# Hugging Face returns a list of lists:
 # results[0] -> Suggestions for the first [MASK]
 # results[1] -> Suggestions for the second [MASK]
+# ... one entry per [MASK], however many there are
 
 # STEP 6: Print results
-mask_positions = ["first [MASK]", "second [MASK]"]
+ordinals = ["first", "second", "third", "fourth", "fifth"]
+mask_positions = [
+    f"{ordinals[i]} [MASK]" if i < len(ordinals) else f"[MASK] #{i + 1}"
+    for i in range(len(results))
+]
 
 for i, mask_results in enumerate(results):
     print(f"\nResults for {mask_positions[i]} position:\n")
@@ -43,6 +49,13 @@ for i, mask_results in enumerate(results):
     # STEP 7: Add your short comment (you can customize!)
     if i == 0:
         print("\nComment: The first mask is expected to be something like 'mat', 'bed', or 'floor'. These fit well with a cat sitting on something.\n")
-    else:
+    elif i == 1:
         print("\nComment: The second mask is expected to be an adjective related to the state of the cat. Words like 'tired', 'sleepy', or 'hungry' make sense.\n")
 
+
+# STEP 8: Best COMPLETE sentences (both masks chosen together)
+# - Step 4 scores each [MASK] on its own; fill_joint() picks
+#   the fillings that work best together.
+print("\nBest joint fillings:\n")
+for candidate in mask_filler.fill_joint(masked_sentence, n_best=3):
+    print(f"  - {candidate['sentence']} (log-prob: {candidate['score']:.2f})")
@@ -1,4 +1,4 @@
-from transformers import AutoTokenizer
+from tokenizer_service import get_tokenizer
 
 sentence = "The cat sat on the mat because it was tired."
 
@@ -11,18 +11,22 @@ sentence = "The cat sat on the mat because it was tired."
 # ✅ SentencePiece Tokenizer: T5 uses SentencePiece (Unigram)
 # ==========================================================
 
-bpe_tokenizer = AutoTokenizer.from_pretrained("gpt2")
-wordpiece_tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
-sentencepiece_tokenizer = AutoTokenizer.from_pretrained("t5-base")
+bpe_tokenizer = get_tokenizer("gpt2")
+wordpiece_tokenizer = get_tokenizer("bert-base-uncased")
+sentencepiece_tokenizer = get_tokenizer("t5-base")
 
-bpe_tokens = bpe_tokenizer.tokenize(sentence)
-bpe_ids = bpe_tokenizer.encode(sentence, add_special_tokens=False)
 
-wordpiece_tokens = wordpiece_tokenizer.tokenize(sentence)
-wordpiece_ids = wordpiece_tokenizer.encode(sentence, add_special_tokens=False)
+def tokenize_once(tokenizer, text):
+    """Tokens and ids from a single encode pass (fast tokenizers expose both)"""
+    encoding = tokenizer(text, add_special_tokens=False)
+    return encoding.tokens(), encoding["input_ids"]
 
-sentencepiece_tokens = sentencepiece_tokenizer.tokenize(sentence)
-sentencepiece_ids = sentencepiece_tokenizer.encode(sentence, add_special_tokens=False)
+
+bpe_tokens, bpe_ids = tokenize_once(bpe_tokenizer, sentence)
+
+wordpiece_tokens, wordpiece_ids = tokenize_once(wordpiece_tokenizer, sentence)
+
+sentencepiece_tokens, sentencepiece_ids = tokenize_once(sentencepiece_tokenizer, sentence)
 
 
 print("\n=== BPE Results (GPT-2) ===")
@@ -0,0 +1,116 @@
+# ==========================================================
+# TOKEN COUNTING SERVICE
+# ----------------------------------------------------------
+# - Tokenizers are loaded lazily (on first use) and cached,
+#   so importing this module is cheap.
+# - A corpus is tokenized in batches with the fast
+#   (Rust-backed) tokenizers, one pass per tokenizer.
+# - The output is the token count of every document for
+#   every tokenizer (used for cost estimation).
+# ==========================================================
+import argparse
+import csv
+import itertools
+import sys
+from functools import lru_cache
+
+from transformers import AutoTokenizer
+
+# ✅ BPE: GPT-2, ✅ WordPiece: BERT, ✅ SentencePiece (Unigram): T5
+DEFAULT_TOKENIZERS = {
+    "bpe": "gpt2",
+    "wordpiece": "bert-base-uncased",
+    "sentencepiece": "t5-base",
+}
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model_name):
+    """Load a fast tokenizer once and keep it in memory"""
+    return AutoTokenizer.from_pretrained(model_name, use_fast=True)
+
+
+def encode_batch(model_name, texts):
+    """Token ids for a list of texts (no special tokens), in one batched call"""
+    tokenizer = get_tokenizer(model_name)
+    encoded = tokenizer(
+        list(texts),
+        add_special_tokens=False,
+        return_attention_mask=False,
+        return_token_type_ids=False,
+        verbose=False,  # Long documents are fine here; we only count
+    )
+    return encoded["input_ids"]
+
+
+def count_tokens(texts, tokenizers=None):
+    """Return {tokenizer_key: [count per text]} for one batch of texts"""
+    tokenizers = tokenizers or DEFAULT_TOKENIZERS
+    texts = list(texts)
+    return {
+        key: [len(ids) for ids in encode_batch(model_name, texts)]
+        for key, model_name in tokenizers.items()
+    }
+
+
+def iter_batches(items, batch_size):
+    """Group any iterable into lists of at most batch_size items"""
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            break
+        yield batch
+
+
+def count_corpus(documents, tokenizers=None, batch_size=1000):
+    """Yield one row per document: {"doc_id", "<tokenizer_key>": count, ...}"""
+    tokenizers = tokenizers or DEFAULT_TOKENIZERS
+    doc_id = 0
+    for batch in iter_batches(documents, batch_size):
+        counts = count_tokens(batch, tokenizers)
+        for i in range(len(batch)):
+            row = {"doc_id": doc_id}
+            for key in tokenizers:
+                row[key] = counts[key][i]
+            yield row
+            doc_id += 1
+
+
+def read_documents(path):
+    """One document per non-empty line"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.strip():
+                yield line
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count tokens per document for BPE / WordPiece / SentencePiece")
+    parser.add_argument("corpus", help="Text file with one document per line")
+    parser.add_argument("--batch_size", type=int, default=1000)
+    parser.add_argument("--output", help="CSV file to write (default: stdout)")
+
+    args = parser.parse_args()
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(out, fieldnames=["doc_id", *DEFAULT_TOKENIZERS])
+        writer.writeheader()
+        totals = dict.fromkeys(DEFAULT_TOKENIZERS, 0)
+        for row in count_corpus(read_documents(args.corpus), batch_size=args.batch_size):
+            writer.writerow(row)
+            for key in totals:
+                totals[key] += row[key]
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print("\n=== Total Tokens ===", file=sys.stderr)
+    for key, total in totals.items():
+        print(f"{key} ({DEFAULT_TOKENIZERS[key]}): {total}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+# ---------------------------------------------------
+# PERSISTENT ANSWER CACHE (SQLite)
+# ---------------------------------------------------
+# - Key = hash of (model name, prompt, generation kwargs),
+#   so changing any of them is a cache miss.
+# - Every hit refreshes `last_used`; when the table grows
+#   past `max_entries` the least recently used rows are
+#   deleted (LRU).
+# ---------------------------------------------------
+CACHE_PATH = "answer_cache.sqlite"
+
+
+def cache_key(model_name, prompt, generation_kwargs):
+    payload = json.dumps([model_name, prompt, generation_kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """On-disk LLM answer cache with size-bounded LRU eviction"""
+
+    def __init__(self, path=CACHE_PATH, max_entries=1_000_000):
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " key TEXT PRIMARY KEY, answer TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used)")
+        self.conn.commit()
+
+    def get_many(self, keys):
+        """Return {key: answer} for the keys that are cached"""
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), 500):  # Stay under SQLite's bound-parameter limit
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, answer FROM answers WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            found.update(rows)
+
+        if found:
+            now = time.time()
+            self.conn.executemany("UPDATE answers SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+            self.conn.commit()
+        return found
+
+    def put_many(self, items):
+        """Store (key, answer) pairs, then evict the oldest rows if over max_entries"""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO answers (key, answer, last_used) VALUES (?, ?, ?)",
+            [(key, answer, now) for key, answer in items],
+        )
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM answers WHERE key IN ("
+                " SELECT key FROM answers ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
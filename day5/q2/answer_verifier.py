@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from kb_index import normalize_question as normalize_text
+
+# ---------------------------------------------------
+# SEMANTIC ANSWER VERIFIER
+# ---------------------------------------------------
+# - Embeds every KB answer ONCE with a small local
+#   sentence encoder and saves the vectors to a .npy
+#   file (keyed by model + KB contents). Later runs
+#   memory-map that file instead of re-encoding.
+# - Generated answers are encoded in batches; all
+#   similarities come from one vectorized product.
+# - An answer whose normalized text EQUALS the KB answer
+#   is accepted without embedding it; everything else
+#   ("4 or 5", "Paris is not the capital") is scored.
+# ---------------------------------------------------
+ENCODER_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+CACHE_DIR = "embedding_cache"
+
+
+class SemanticVerifier:
+    """Decide whether LLM answers agree with KB answers"""
+
+    def __init__(self, entries, model_name=ENCODER_NAME, cache_dir=CACHE_DIR, threshold=0.75, batch_size=256):
+        self.answers = [entry["answer"] for entry in entries]
+        self.normalized_answers = [normalize_text(answer) for answer in self.answers]
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self._encoder = None
+        self.kb_embeddings = self._load_or_build_embeddings()
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = SentenceTransformer(self.model_name)
+        return self._encoder
+
+    def encode(self, texts):
+        """Unit-length float32 embeddings, shape (len(texts), dim)"""
+        return self.encoder.encode(
+            list(texts), batch_size=self.batch_size, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=False,
+        ).astype(np.float32)
+
+    def _cache_path(self):
+        digest = hashlib.sha256(json.dumps([self.model_name, self.answers]).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"kb_answers.{digest}.npy")
+
+    def _load_or_build_embeddings(self):
+        path = self._cache_path()
+        if not os.path.exists(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            embeddings = self.encode(self.answers)
+            # Per-process temp file, so parallel runs never write into the same file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=os.path.basename(path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, embeddings)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        return np.load(path, mmap_mode="r")
+
+    def similarities(self, llm_answers, entry_ids):
+        """Cosine similarity of each LLM answer to the KB answer of its entry"""
+        generated = self.encode(llm_answers)
+        reference = self.kb_embeddings[np.asarray(entry_ids, dtype=np.int64)]
+        return np.einsum("ij,ij->i", generated, reference)  # Row-wise dot product
+
+    def verify(self, llm_answers, entry_ids):
+        """Return [(is_correct, similarity)] for each (answer, KB entry id) pair"""
+        results = [None] * len(llm_answers)
+        pending = []
+        for i, (answer, entry_id) in enumerate(zip(llm_answers, entry_ids)):
+            if normalize_text(answer) == self.normalized_answers[entry_id]:
+                results[i] = (True, 1.0)
+            else:
+                pending.append(i)
+
+        if pending:
+            scores = self.similarities([llm_answers[i] for i in pending], [entry_ids[i] for i in pending])
+            for i, score in zip(pending, scores):
+                results[i] = (bool(score >= self.threshold), float(score))
+        return results
@@ -0,0 +1,61 @@
+import queue
+import threading
+
+import torch
+
+# ---------------------------------------------------
+# BATCHED GENERATION RUNNER
+# ---------------------------------------------------
+# - Questions are sorted by length and cut into padded
+#   batches of `batch_size` (less padding per batch).
+# - A background thread tokenizes the NEXT batches
+#   while the model is generating the current one.
+# - Answers are yielded as soon as their batch is done,
+#   as (question index, answer) pairs.
+# ---------------------------------------------------
+_DONE = object()  # Marks the end of the tokenized-batch queue
+
+
+def _tokenize_worker(tokenizer, questions, order, batch_size, out_queue):
+    try:
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            encoded = tokenizer([questions[i] for i in indices], padding=True, truncation=True, return_tensors="pt")
+            out_queue.put((indices, encoded))
+    except Exception as exc:  # Hand the error to the consumer instead of hanging it
+        out_queue.put(exc)
+    finally:
+        out_queue.put(_DONE)
+
+
+def generate_batched(model, tokenizer, questions, batch_size=16, prefetch=2, **generate_kwargs):
+    """Yield (index, answer) for every question, batch by batch"""
+    order = sorted(range(len(questions)), key=lambda i: len(questions[i]))
+    batches = queue.Queue(maxsize=prefetch)  # Bounded: tokenizer stays at most `prefetch` batches ahead
+    worker = threading.Thread(
+        target=_tokenize_worker, args=(tokenizer, questions, order, batch_size, batches), daemon=True,
+    )
+    worker.start()
+
+    while True:
+        item = batches.get()
+        if item is _DONE:
+            break
+        if isinstance(item, Exception):
+            raise item
+
+        indices, encoded = item
+        encoded = encoded.to(model.device)
+        with torch.inference_mode():
+            output_ids = model.generate(**encoded, **generate_kwargs)
+        answers = tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+        for i, answer in zip(indices, answers):
+            yield i, answer.strip()
+
+    worker.join()
+
+
+def generate_with_pipeline(llm_pipeline, questions, batch_size=16, **generate_kwargs):
+    """Same as generate_batched(), using the model / tokenizer inside a HF pipeline"""
+    return generate_batched(llm_pipeline.model, llm_pipeline.tokenizer, questions, batch_size, **generate_kwargs)
@@ -1,11 +1,15 @@
-import json
 from transformers import pipeline
 
+from answer_cache import AnswerCache, cache_key
+from answer_verifier import SemanticVerifier
+from batch_runner import generate_with_pipeline
+from kb_index import KBIndex
+
 # ---------------------------------------------------
-# STEP 1: Load the KB
+# STEP 1: Load the KB (indexed once for O(1) lookups)
 # ---------------------------------------------------
-with open("kb.json", "r") as f:
-    knowledge_base = json.load(f)
+kb_index = KBIndex.from_json("kb.json")
+knowledge_base = kb_index.entries
 
 # ---------------------------------------------------
 # STEP 2: All questions we'll test
@@ -26,34 +30,76 @@ test_questions = [
 # ---------------------------------------------------
 model_name = "google/flan-t5-base"  # Small, instruction-tuned
 llm_pipeline = pipeline("text2text-generation", model=model_name)
+batch_size = 16  # Questions per padded generate() call
+generation_kwargs = {"max_new_tokens": 30}
+
+# Answers from earlier runs (same model + question + settings) are reused
+answer_cache = AnswerCache()
+
+# Embeddings of all KB answers (computed once, then memory-mapped from disk)
+verifier = SemanticVerifier(knowledge_base)
 
 # ---------------------------------------------------
 # STEP 4: Loop through questions
 # ---------------------------------------------------
+matched_ids = []
+match_scores = []
 for user_question in test_questions:
+    # Find match in KB (exact, or a close near-match that is only reported)
+    matched_id, similarity = kb_index.lookup_id(user_question)
+    matched_ids.append(matched_id)
+    match_scores.append(similarity)
+
+# ---------------------------------------------------
+# STEP 5: Get LLM's Answers (cache first, then padded batches)
+# ---------------------------------------------------
+keys = [cache_key(model_name, question, generation_kwargs) for question in test_questions]
+cached = answer_cache.get_many(keys)
+llm_answers = [cached.get(key) for key in keys]
+
+missing = [i for i, answer in enumerate(llm_answers) if answer is None]
+print(f"{len(test_questions) - len(missing)} answers from cache, generating {len(missing)}...")
+
+new_items = []
+for done, (j, llm_answer) in enumerate(
+    generate_with_pipeline(llm_pipeline, [test_questions[i] for i in missing], batch_size=batch_size,
+                           **generation_kwargs),
+    start=1,
+):
+    i = missing[j]
+    llm_answers[i] = llm_answer
+    new_items.append((keys[i], llm_answer))
+    if done % 1000 == 0:
+        print(f"Generated {done}/{len(missing)} answers...")
+        answer_cache.put_many(new_items)  # Save progress as we go
+        new_items = []
+
+answer_cache.put_many(new_items)
+answer_cache.close()
+
+# ---------------------------------------------------
+# STEP 6: Validate (all in-domain answers in one batch)
+# ---------------------------------------------------
+# Only EXACT matches are checked: a near match ("2 + 3" vs "2 + 2") may be a different question
+in_domain = [i for i, matched_id in enumerate(matched_ids) if matched_id is not None and match_scores[i] == 1.0]
+verdicts = dict(zip(in_domain, verifier.verify(
+    [llm_answers[i] for i in in_domain], [matched_ids[i] for i in in_domain],
+)))
+
+for i, user_question in enumerate(test_questions):
     print("\n--------------------------------------")
     print(f"Q: {user_question}")
+    matched_id = matched_ids[i]
+    print(f"LLM Answer: {llm_answers[i]}")
 
-    # Find match in KB
-    matched_entry = None
-    for entry in knowledge_base:
-        if entry["question"].lower() == user_question.lower():
-            matched_entry = entry
-            break
-
-    # ---------------------------------------------------
-    # STEP 5: Get LLM's Answer
-    # ---------------------------------------------------
-    llm_answer = llm_pipeline(user_question, max_new_tokens=30)[0]["generated_text"].strip()
-    print(f"LLM Answer: {llm_answer}")
-
-    # ---------------------------------------------------
-    # STEP 6: Validate
-    # ---------------------------------------------------
-    if matched_entry:
-        if matched_entry["answer"].lower() == llm_answer.lower():
-            print("\n✅ CORRECT: LLM's answer matches KB.")
+    if i in verdicts:
+        is_correct, score = verdicts[i]
+        if is_correct:
+            print(f"\n✅ CORRECT: LLM's answer matches KB (similarity {score:.2f}).")
         else:
-            print("\n❌ RETRY: Answer differs from KB.")
+            print(f"\n❌ RETRY: Answer differs from KB (similarity {score:.2f}).")
+    elif matched_id is not None:
+        print(f"\n⚠️ NEAR MATCH ({match_scores[i]:.2f}), not verified: closest KB question is "
+              f"\"{knowledge_base[matched_id]['question']}\".")
     else:
         print("\n⚠️ RETRY: Out-of-domain question.")
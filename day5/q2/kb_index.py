@@ -0,0 +1,102 @@
+import json
+import re
+from collections import Counter, defaultdict
+
+# ---------------------------------------------------
+# KNOWLEDGE-BASE INDEX
+# ---------------------------------------------------
+# - Questions are normalized ONCE when the KB is loaded
+#   and stored in a dict -> exact lookups are O(1).
+# - An optional character-trigram index finds near
+#   matches (typos, extra spaces, missing "?").
+# - Trigrams shared by more than max_postings questions
+#   (" wh", "wha", "hat", ...) are skipped, and only the
+#   top max_candidates questions get a full Jaccard score,
+#   so a miss costs the same on a 10-entry or 1M-entry KB.
+# ---------------------------------------------------
+_QUOTES = re.compile(r"[\"'`‘’‚‛“”„«»]")
+_PUNCT = re.compile(r"(?<!\d)[.,;:!?()\[\]{}]|[.,;:!?()\[\]{}](?!\d)")  # Keeps decimal points like 3.14
+_SPACES = re.compile(r"\s+")
+
+MAX_POSTINGS = 1000   # Trigrams in more questions than this are too common to tell questions apart
+MAX_CANDIDATES = 20   # Questions scored exactly per fuzzy lookup
+
+
+def normalize_question(question):
+    """Lowercase, drop quotes and punctuation, collapse whitespace"""
+    question = _QUOTES.sub("", question.lower())
+    question = _PUNCT.sub(" ", question)
+    return _SPACES.sub(" ", question).strip()
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class KBIndex:
+    """Constant-time question -> KB entry lookup, with optional fuzzy fallback"""
+
+    def __init__(self, entries, fuzzy=True, max_postings=MAX_POSTINGS, max_candidates=MAX_CANDIDATES):
+        self.entries = list(entries)
+        self.exact = {}
+        for i, entry in enumerate(self.entries):
+            self.exact.setdefault(normalize_question(entry["question"]), i)  # First entry wins, like the old scan
+
+        self.fuzzy = fuzzy
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        self._keys = {}
+        self._postings = defaultdict(list)  # trigram -> entry ids
+        if fuzzy:
+            for key, i in self.exact.items():
+                self._keys[i] = key
+                for gram in trigrams(key):
+                    self._postings[gram].append(i)
+
+    @classmethod
+    def from_json(cls, path, fuzzy=True):
+        with open(path, "r") as f:
+            return cls(json.load(f), fuzzy=fuzzy)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, question, min_similarity=0.8):
+        """Return (entry, similarity) for the best match, or (None, 0.0)
+
+        similarity is 1.0 for an exact (normalized) match, otherwise the
+        trigram Jaccard score of the closest question above min_similarity.
+        A score below 1.0 only means the questions LOOK alike ("2 + 2" vs
+        "2 + 3"), so callers must not treat the entry's answer as verified.
+        """
+        i, similarity = self.lookup_id(question, min_similarity)
+        return (None, 0.0) if i is None else (self.entries[i], similarity)
+
+    def lookup_id(self, question, min_similarity=0.8):
+        """Like lookup(), but returns the entry's position in the KB"""
+        key = normalize_question(question)
+        i = self.exact.get(key)
+        if i is not None:
+            return i, 1.0
+        if not self.fuzzy:
+            return None, 0.0
+
+        # Count shared RARE trigrams only: each posting list read is at most max_postings long
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            posting = self._postings.get(gram, ())
+            if len(posting) <= self.max_postings:
+                shared.update(posting)
+
+        best, best_score = None, 0.0
+        for i, _ in shared.most_common(self.max_candidates):
+            other = trigrams(self._keys[i])
+            score = len(grams & other) / len(grams | other)
+            if score > best_score:
+                best, best_score = i, score
+
+        if best is None or best_score < min_similarity:
+            return None, 0.0
+        return best, best_score
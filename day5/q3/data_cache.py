@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from data_stream import iter_csv_chunks, read_header
+
+
+# ==================================================
+# BINARY CACHE FOR THE TRAINING CSV
+# --------------------------------------------------
+# - The first run parses the CSV once and writes it
+#   to "<csv>.npy" next to the source file.
+# - Later runs memory-map that .npy, so startup skips
+#   the text parsing and processes share the pages.
+# - "<csv>.npy.json" remembers the source size, mtime
+#   and SHA-256; the cache is rebuilt when they change.
+# ==================================================
+CHUNK_ROWS = 100_000  # Rows parsed at a time while building the cache
+
+
+def file_sha256(path, block_size=1 << 20):
+    """SHA-256 of a file, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_paths(csv_path):
+    """Return (npy_path, meta_path) for a CSV file"""
+    npy_path = csv_path + ".npy"
+    return npy_path, npy_path + ".json"
+
+
+def _source_stat(csv_path):
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _unique_tmp_path(path):
+    """New empty file next to `path`, unique to this process (so parallel builds never share it)"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    return tmp_path
+
+
+def _publish(tmp_path, path):
+    """Atomically move a finished temp file to its final name (or remove it on failure)"""
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = _unique_tmp_path(meta_path)
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    _publish(tmp_path, meta_path)
+
+
+def build_cache(csv_path, sha256=None):
+    """Parse the CSV chunk by chunk into a .npy file and return its path"""
+    npy_path, meta_path = cache_paths(csv_path)
+    n_cols = len(read_header(csv_path))
+
+    # Count the data rows first so the output can be preallocated on disk
+    with open(csv_path, "r") as f:
+        next(f)  # Skip the header row
+        n_rows = sum(1 for line in f if line.strip())
+
+    # Each process writes its own temp file; the last complete one wins the rename
+    tmp_path = _unique_tmp_path(npy_path)
+    try:
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=(n_rows, n_cols))
+        row = 0
+        for chunk in iter_csv_chunks(csv_path, CHUNK_ROWS):
+            out[row:row + len(chunk)] = chunk
+            row += len(chunk)
+        out.flush()
+        del out
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    _publish(tmp_path, npy_path)
+
+    meta = _source_stat(csv_path)
+    meta["sha256"] = sha256 or file_sha256(csv_path)
+    _write_meta(meta_path, meta)
+    return npy_path
+
+
+def load_cached(csv_path):
+    """Return the CSV contents as a read-only memory-mapped array"""
+    npy_path, meta_path = cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    stat = _source_stat(csv_path)
+
+    if meta is None or not os.path.exists(npy_path):
+        build_cache(csv_path)
+    elif meta["size"] != stat["size"] or meta["mtime_ns"] != stat["mtime_ns"]:
+        # File was touched: only rebuild if the contents really changed
+        sha256 = file_sha256(csv_path)
+        if sha256 == meta.get("sha256"):
+            meta.update(stat)
+            _write_meta(meta_path, meta)
+        else:
+            build_cache(csv_path, sha256)
+
+    return np.load(npy_path, mmap_mode="r")
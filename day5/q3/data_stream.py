@@ -0,0 +1,43 @@
+import itertools
+
+import numpy as np
+
+
+# ==================================================
+# STREAMING DATA READER
+# --------------------------------------------------
+# Reads the training CSV a few rows at a time so the
+# whole file never has to sit in memory at once.
+# ==================================================
+def read_header(path):
+    """Return the column names from the first line of the CSV"""
+    with open(path, "r") as f:
+        return f.readline().strip().split(",")
+
+
+def iter_csv_chunks(path, batch_size):
+    """Yield raw 2D row chunks of at most batch_size rows"""
+    with open(path, "r") as f:
+        next(f)  # Skip the header row
+        while True:
+            lines = list(itertools.islice(f, batch_size))
+            if not lines:
+                break
+
+            chunk = np.loadtxt(lines, delimiter=",", ndmin=2)
+            if chunk.size == 0:  # Only blank lines were left
+                continue
+            yield chunk
+
+
+def iter_csv_batches(path, batch_size, n_features=3):
+    """Yield (X_batch, y_batch) chunks of at most batch_size rows"""
+    for chunk in iter_csv_chunks(path, batch_size):
+        yield chunk[:, 0:n_features], chunk[:, n_features]
+
+
+def iter_array_batches(data, batch_size, n_features=3):
+    """Yield (X_batch, y_batch) slices of an in-memory or memory-mapped array"""
+    for start in range(0, len(data), batch_size):
+        chunk = data[start:start + batch_size]
+        yield chunk[:, 0:n_features], chunk[:, n_features]
@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# ==================================================
+# NUMERICALLY STABLE KERNELS
+# --------------------------------------------------
+# - Never call exp() on a large positive number, so
+#   big logits cannot overflow to inf / NaN.
+# - Every function takes out= (and scratch=) buffers
+#   so a training loop can allocate them once and
+#   reuse them for every epoch.
+# ==================================================
+def stable_sigmoid(z, out=None):
+    """Logistic function as 0.5 * (1 + tanh(z / 2)); safe for any z"""
+    out = np.multiply(z, 0.5, out=out)
+    np.tanh(out, out=out)
+    out += 1.0
+    out *= 0.5
+    return out
+
+
+def bce_with_logits(z, y, out=None, scratch=None, axis=None):
+    """Binary Cross-Entropy computed straight from the logits z
+
+    Uses  max(z, 0) - z * y + log(1 + exp(-|z|)),  which equals the usual
+    -[y log(p) + (1 - y) log(1 - p)] with p = sigmoid(z) but never takes
+    log(0). The per-row losses are left in `out`; the mean is returned.
+    """
+    out = np.abs(z, out=out)
+    np.negative(out, out=out)
+    np.exp(out, out=out)      # exp(-|z|) is always in (0, 1]
+    np.log1p(out, out=out)
+
+    out += np.maximum(z, 0.0, out=scratch)
+    out -= np.multiply(z, y, out=scratch)
+    return np.mean(out, axis=axis)
+
+
+class Buffers:
+    """Reusable work arrays for one training loop, grown only when a batch is bigger"""
+
+    def __init__(self, n_cols=None):
+        self.n_cols = n_cols  # None for a single model, K for K models
+        self.capacity = 0
+
+    def get(self, n_rows):
+        """Return views of n_rows rows: (z, y_pred, loss, scratch, hit)"""
+        if n_rows > self.capacity:
+            shape = (n_rows,) if self.n_cols is None else (n_rows, self.n_cols)
+            self.z = np.empty(shape)
+            self.y_pred = np.empty(shape)
+            self.loss = np.empty(shape)
+            self.scratch = np.empty(shape)
+            self.hit = np.empty(shape, dtype=bool)
+            self.capacity = n_rows
+        return (self.z[:n_rows], self.y_pred[:n_rows], self.loss[:n_rows],
+                self.scratch[:n_rows], self.hit[:n_rows])
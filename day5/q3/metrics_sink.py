@@ -0,0 +1,57 @@
+import csv
+import time
+
+
+# ==================================================
+# METRICS SINK
+# --------------------------------------------------
+# - Appends one CSV row per epoch (and per model)
+#   while training runs, instead of keeping every
+#   value in Python lists.
+# - The file is flushed every `flush_every` rows so
+#   it can be tailed / plotted during a long run.
+# - Plot it afterwards with plot_metrics.py.
+# ==================================================
+FIELDNAMES = ["epoch", "model", "loss", "accuracy", "wall_time"]
+
+
+class MetricsSink:
+    """Write per-epoch loss, accuracy and elapsed seconds to a CSV file"""
+
+    def __init__(self, path, flush_every=100):
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(FIELDNAMES)
+        self._rows = 0
+        self._start = time.perf_counter()
+
+    def log(self, epoch, loss, accuracy, model=0):
+        self._writer.writerow([epoch, model, f"{loss:.6g}", f"{accuracy:.6g}",
+                               f"{time.perf_counter() - self._start:.4f}"])
+        self._rows += 1
+        if self._rows % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_metrics(path):
+    """Load a metrics CSV as {model: (epochs, losses, accuracies)}"""
+    curves = {}
+    with open(path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            epochs, losses, accuracies = curves.setdefault(int(row["model"]), ([], [], []))
+            epochs.append(int(row["epoch"]))
+            losses.append(float(row["loss"]))
+            accuracies.append(float(row["accuracy"]))
+    return curves
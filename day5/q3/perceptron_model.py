@@ -0,0 +1,77 @@
+import numpy as np
+
+from data_stream import iter_csv_chunks
+from kernels import stable_sigmoid
+
+# ==================================================
+# TRAINED MODEL: SAVE / LOAD / PREDICT
+# --------------------------------------------------
+# - save_model() stores weights + bias in a small .npz
+# - PerceptronModel scores rows without importing the
+#   training code
+# - predict_chunks() / predict_file() score a stream
+#   of batches, so any number of rows can be served
+#   with memory bounded by the batch size
+# ==================================================
+
+
+def save_model(path, weights, bias, feature_names=None):
+    """Write the trained parameters to a .npz file"""
+    np.savez(
+        path,
+        weights=np.asarray(weights, dtype=np.float64),
+        bias=np.float64(bias),
+        feature_names=np.array(feature_names or [], dtype=str),
+    )
+
+
+def load_model(path):
+    """Read a .npz written by save_model()"""
+    with np.load(path) as f:
+        return PerceptronModel(f["weights"], float(f["bias"]), [str(name) for name in f["feature_names"]])
+
+
+class PerceptronModel:
+    """Vectorized scoring with a trained perceptron"""
+
+    def __init__(self, weights, bias, feature_names=None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.feature_names = feature_names or []
+
+    @property
+    def n_features(self):
+        return len(self.weights)
+
+    def decision_function(self, X, out=None):
+        """Raw logits z = X . w + b for a 2D batch"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        z = np.dot(X, self.weights, out=out)
+        z += self.bias
+        return z
+
+    def predict_proba(self, X):
+        """Probability of label 1 for every row"""
+        z = self.decision_function(X)
+        return stable_sigmoid(z, out=z)
+
+    def predict(self, X, threshold=0.5):
+        """0/1 label for every row"""
+        if threshold == 0.5:
+            return (self.decision_function(X) >= 0.0).astype(np.int8)  # Skips the sigmoid
+        return (self.predict_proba(X) >= threshold).astype(np.int8)
+
+    def predict_chunks(self, batches, proba=True):
+        """Score an iterable of 2D feature batches, yielding one result array per batch"""
+        for X_batch in batches:
+            yield self.predict_proba(X_batch) if proba else self.predict(X_batch)
+
+    def predict_file(self, path, batch_size=100_000, proba=True):
+        """Score a CSV (with header) chunk by chunk; extra trailing columns such as labels are ignored"""
+        batches = (chunk[:, 0:self.n_features] for chunk in iter_csv_chunks(path, batch_size))
+        return self.predict_chunks(batches, proba)
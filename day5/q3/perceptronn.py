@@ -1,104 +1,325 @@
 import numpy as np
 
-# ==================================================
-# STEP 1: LOAD DATA
-# ==================================================
-data = np.loadtxt("fruit.csv", delimiter=",", skiprows=1)
-
-X = data[:, 0:3]  # Features
-y = data[:, 3]    # Labels
-n_samples, n_features = X.shape
-
+from data_cache import load_cached
+from data_stream import iter_array_batches, iter_csv_batches, read_header
+from kernels import Buffers, bce_with_logits, stable_sigmoid
+from metrics_sink import MetricsSink
+from perceptron_model import save_model
+from plot_metrics import plot_metrics
 
 # ==================================================
-# STEP 2: INITIALIZE WEIGHTS & BIAS
+# SETTINGS
 # ==================================================
-np.random.seed(42)           # Makes results reproducible
-weights = np.random.randn(n_features) * 0.01  # Small random numbers
-bias = 0.0
+DATA_PATH = "fruit.csv"
+TRAIN_MODE = "full"   # "full" = whole dataset every epoch, "minibatch" = update per chunk of BATCH_SIZE rows,
+                      # "multi" = train one model per entry of SEEDS together
+BATCH_SIZE = 4        # Rows per chunk in "minibatch" mode
+USE_CACHE = True      # Memory-map a cached .npy copy instead of reparsing the CSV
+SEEDS = [42, 0, 1, 2]  # Initial-weight seeds for "multi" mode
+METRICS_PATH = "metrics.csv"  # Per-epoch loss / accuracy / wall time, written during training
+MODEL_PATH = "perceptron_model.npz"  # Trained weights / bias, loaded by perceptron_model.load_model()
+PLOT_PATH = "metrics.png"  # Plot METRICS_PATH to this image after training (None = skip; never opens a window)
 
 
 # ==================================================
 # UTILITY FUNCTIONS
 # ==================================================
-def sigmoid(z):
-    """Activation function for the neuron"""
-    return 1 / (1 + np.exp(-z))
+def sigmoid(z, out=None):
+    """Activation function for the neuron (overflow-safe)"""
+    return stable_sigmoid(z, out=out)
 
 
-def compute_loss(y_true, y_pred):
-    """Binary Cross-Entropy loss"""
-    epsilon = 1e-15  # Avoid log(0) error
-    return -np.mean(y_true * np.log(y_pred + epsilon) + (1 - y_true) * np.log(1 - y_pred + epsilon))
+def init_params(n_features, seed=42):
+    """Small random weights and a zero bias"""
+    np.random.seed(seed)           # Makes results reproducible
+    weights = np.random.randn(n_features) * 0.01  # Small random numbers
+    bias = 0.0
+    return weights, bias
 
 
 # ==================================================
-# STEP 3: TRAIN LOOP
+# TRAIN LOOP (FULL BATCH)
 # ==================================================
-learning_rate = 0.01
-epochs = 500
-losses = []
-accuracies = []
+def train_full(X, y, learning_rate=0.01, epochs=500, seed=42, verbose=True, sink=None, keep_history=True):
+    """Gradient descent over the whole dataset every epoch
+
+    If `sink` is given every epoch is written to it; with keep_history=False
+    the returned losses / accuracies lists stay empty so memory stays flat.
+    """
+    n_samples, n_features = X.shape
+    weights, bias = init_params(n_features, seed)
+    losses = []
+    accuracies = []
 
-for epoch in range(1, epochs + 1):
+    # Work arrays are allocated once and reused every epoch
+    z, y_pred, row_loss, error, hit = Buffers().get(n_samples)
+    dW = np.empty(n_features)
 
-    # Forward Pass
-    z = np.dot(X, weights) + bias
-    y_pred = sigmoid(z)
+    for epoch in range(1, epochs + 1):
 
-    # Compute loss
-    loss = compute_loss(y, y_pred)
+        # Forward Pass
+        np.dot(X, weights, out=z)
+        z += bias
+        sigmoid(z, out=y_pred)
 
-    # Compute accuracy
-    accuracy = np.mean((y_pred >= 0.5) == y)
+        # Compute loss (straight from the logits, so it never hits log(0))
+        loss = bce_with_logits(z, y, out=row_loss, scratch=error)
 
-    losses.append(loss)
-    accuracies.append(accuracy)
+        # Compute accuracy (y_pred >= 0.5 is the same as z >= 0)
+        np.greater_equal(z, 0.0, out=hit)
+        np.equal(hit, y, out=hit)
+        accuracy = np.count_nonzero(hit) / n_samples
 
-    # Backward Pass (Gradients)
-    error = y_pred - y
-    dW = np.dot(X.T, error) / n_samples
-    dB = np.sum(error) / n_samples
+        if keep_history:
+            losses.append(loss)
+            accuracies.append(accuracy)
+        if sink is not None:
+            sink.log(epoch, loss, accuracy)
 
-    # Update Parameters
-    weights -= learning_rate * dW
-    bias -= learning_rate * dB
+        # Backward Pass (Gradients)
+        np.subtract(y_pred, y, out=error)
+        np.dot(X.T, error, out=dW)
+        dW /= n_samples
+        dB = np.sum(error) / n_samples
 
-    # Optional: Print status every 100 epochs
-    if epoch % 100 == 0:
-        print(f"Epoch [{epoch}/{epochs}], Loss: {loss:.4f}, Accuracy: {accuracy:.4f}")
+        # Update Parameters
+        dW *= learning_rate
+        weights -= dW
+        bias -= learning_rate * dB
 
-    # Early stopping if loss is low
-    if loss < 0.05:
-        print(f"Early stopping at epoch {epoch} as loss dropped below 0.05.")
-        break
+        # Optional: Print status every 100 epochs
+        if verbose and epoch % 100 == 0:
+            print(f"Epoch [{epoch}/{epochs}], Loss: {loss:.4f}, Accuracy: {accuracy:.4f}")
+
+        # Early stopping if loss is low
+        if loss < 0.05:
+            if verbose:
+                print(f"Early stopping at epoch {epoch} as loss dropped below 0.05.")
+            break
+
+    return weights, bias, losses, accuracies
 
 
 # ==================================================
-# STEP 4: Final Results
+# TRAIN LOOP (MINI-BATCH / STREAMING)
+# --------------------------------------------------
+# - make_batches() is called once per epoch and must
+#   return a fresh iterator of (X_batch, y_batch).
+# - Weights are updated after every batch, so memory
+#   depends on the batch size, not the file size.
 # ==================================================
-print("\nFinal Weights:", weights)
-print("Final Bias:", bias)
+def train_minibatch(make_batches, n_features, learning_rate=0.01, epochs=500, seed=42, verbose=True,
+                    sink=None, keep_history=True):
+    """Mini-batch gradient descent over a stream of batches (sink / keep_history as in train_full)"""
+    weights, bias = init_params(n_features, seed)
+    losses = []
+    accuracies = []
+
+    # Work arrays sized to the largest batch seen so far, reused across batches and epochs
+    buffers = Buffers()
+    dW = np.empty(n_features)
+
+    for epoch in range(1, epochs + 1):
+        loss_sum = 0.0
+        correct = 0
+        seen = 0
+
+        for X_batch, y_batch in make_batches():
+            batch_len = len(y_batch)
+            z, y_pred, row_loss, error, hit = buffers.get(batch_len)
+
+            # Forward Pass
+            np.dot(X_batch, weights, out=z)
+            z += bias
+            sigmoid(z, out=y_pred)
+
+            # Running loss / accuracy (before this batch's update)
+            loss_sum += bce_with_logits(z, y_batch, out=row_loss, scratch=error) * batch_len
+            np.greater_equal(z, 0.0, out=hit)
+            np.equal(hit, y_batch, out=hit)
+            correct += np.count_nonzero(hit)
+            seen += batch_len
+
+            # Backward Pass (Gradients)
+            np.subtract(y_pred, y_batch, out=error)
+            np.dot(X_batch.T, error, out=dW)
+            dW /= batch_len
+            dB = np.sum(error) / batch_len
+
+            # Update Parameters
+            dW *= learning_rate
+            weights -= dW
+            bias -= learning_rate * dB
+
+        if seen == 0:
+            raise ValueError("No training rows were produced by the batch stream")
+
+        loss = loss_sum / seen
+        accuracy = correct / seen
+        if keep_history:
+            losses.append(loss)
+            accuracies.append(accuracy)
+        if sink is not None:
+            sink.log(epoch, loss, accuracy)
+
+        # Optional: Print status every 100 epochs
+        if verbose and epoch % 100 == 0:
+            print(f"Epoch [{epoch}/{epochs}], Loss: {loss:.4f}, Accuracy: {accuracy:.4f}")
+
+        # Early stopping if loss is low
+        if loss < 0.05:
+            if verbose:
+                print(f"Early stopping at epoch {epoch} as loss dropped below 0.05.")
+            break
+
+    return weights, bias, losses, accuracies
+
 
 # ==================================================
-# NEXT STEP: Plot Results
+# TRAIN LOOP (K MODELS AT ONCE)
+# --------------------------------------------------
+# - The K weight vectors are stacked into a matrix W
+#   of shape (n_features, K), so one matmul does the
+#   forward pass and one does the gradient for all.
+# - y can be shape (n,) (same labels, e.g. several
+#   seeds) or (n, K) (e.g. one-vs-rest targets).
+# - Each model has its own early-stopping flag; a
+#   stopped model keeps its weights frozen.
 # ==================================================
-import matplotlib.pyplot as plt
+def init_params_multi(n_features, seeds):
+    """One column of small random weights per seed (same values as init_params)"""
+    W = np.column_stack([np.random.RandomState(seed).randn(n_features) * 0.01 for seed in seeds])
+    b = np.zeros(len(seeds))
+    return W, b
+
+
+def train_multi(X, y, seeds, learning_rate=0.01, epochs=500, verbose=True, sink=None, keep_history=True):
+    """Train len(seeds) perceptrons together; returns per-model histories
+
+    The sink gets one row per active model per epoch (model = seed index).
+    """
+    n_samples, n_features = X.shape
+    W, b = init_params_multi(n_features, seeds)
+    n_models = W.shape[1]
+
+    Y = y.reshape(-1, 1) if y.ndim == 1 else y  # Broadcasts against (n, K)
+    active = np.ones(n_models, dtype=bool)
+    history_rows = epochs if keep_history else 0
+    losses = np.full((history_rows, n_models), np.nan)
+    accuracies = np.full((history_rows, n_models), np.nan)
+    stopped_at = np.full(n_models, epochs)
+
+    # Work arrays are allocated once and reused every epoch
+    Z, Y_pred, row_loss, error, hit = Buffers(n_models).get(n_samples)
+    dW = np.empty((n_features, n_models))
+
+    for epoch in range(1, epochs + 1):
+
+        # Forward Pass (all models)
+        np.dot(X, W, out=Z)
+        Z += b
+        sigmoid(Z, out=Y_pred)
+
+        # Per-model loss and accuracy
+        loss = bce_with_logits(Z, Y, out=row_loss, scratch=error, axis=0)
+        np.greater_equal(Z, 0.0, out=hit)
+        np.equal(hit, Y, out=hit)
+        accuracy = np.count_nonzero(hit, axis=0) / n_samples
+
+        if keep_history:
+            losses[epoch - 1, active] = loss[active]
+            accuracies[epoch - 1, active] = accuracy[active]
+        if sink is not None:
+            for k in np.flatnonzero(active):
+                sink.log(epoch, loss[k], accuracy[k], model=k)
+
+        # Backward Pass (Gradients, all models)
+        np.subtract(Y_pred, Y, out=error)
+        np.dot(X.T, error, out=dW)
+        dW /= n_samples
+        dB = np.sum(error, axis=0) / n_samples
+
+        # Update only the models that are still training
+        dW *= learning_rate * active
+        W -= dW
+        b -= learning_rate * dB * active
+
+        if verbose and epoch % 100 == 0:
+            print(f"Epoch [{epoch}/{epochs}], Active models: {active.sum()}/{n_models}, "
+                  f"Mean loss: {loss[active].mean():.4f}")
+
+        # Early stopping per model
+        newly_stopped = active & (loss < 0.05)
+        stopped_at[newly_stopped] = epoch
+        active &= ~newly_stopped
+        if not active.any():
+            if verbose:
+                print(f"All models stopped early by epoch {epoch}.")
+            break
+
+    histories = [
+        (losses[:stopped_at[k], k].tolist(), accuracies[:stopped_at[k], k].tolist())
+        for k in range(n_models)
+    ]
+    return W, b, histories
+
+
+if __name__ == "__main__":
+    learning_rate = 0.01
+    epochs = 500
+
+    # Metrics go straight to disk; nothing per-epoch is kept in memory
+    with MetricsSink(METRICS_PATH) as sink:
+        if TRAIN_MODE == "minibatch" and not USE_CACHE:
+            # ==================================================
+            # STEP 1: STREAM DATA (never loads the whole file)
+            # ==================================================
+            n_features = len(read_header(DATA_PATH)) - 1  # Last column is the label
+            weights, bias, _, _ = train_minibatch(
+                lambda: iter_csv_batches(DATA_PATH, BATCH_SIZE, n_features),
+                n_features, learning_rate, epochs, sink=sink, keep_history=False,
+            )
+        else:
+            # ==================================================
+            # STEP 1: LOAD DATA
+            # ==================================================
+            if USE_CACHE:
+                data = load_cached(DATA_PATH)  # Memory-mapped, parsed only once
+            else:
+                data = np.loadtxt(DATA_PATH, delimiter=",", skiprows=1)
+
+            X = data[:, 0:3]  # Features
+            y = data[:, 3]    # Labels
+
+            if TRAIN_MODE == "minibatch":
+                weights, bias, _, _ = train_minibatch(
+                    lambda: iter_array_batches(data, BATCH_SIZE),
+                    X.shape[1], learning_rate, epochs, sink=sink, keep_history=False,
+                )
+            elif TRAIN_MODE == "multi":
+                W, b, _ = train_multi(X, y, SEEDS, learning_rate, epochs, sink=sink, keep_history=False)
 
-plt.figure(figsize=(12,5))
+                # Report the model with the lowest final loss
+                final_losses = bce_with_logits(np.dot(X, W) + b, y.reshape(-1, 1), axis=0)
+                for k, seed in enumerate(SEEDS):
+                    print(f"Seed {seed}: final loss {final_losses[k]:.4f}")
+                best = int(np.argmin(final_losses))
+                weights, bias = W[:, best], b[best]
+            else:
+                weights, bias, _, _ = train_full(X, y, learning_rate, epochs, sink=sink, keep_history=False)
 
-# Plot the loss
-plt.subplot(1,2,1)
-plt.plot(range(1, len(losses)+1), losses, '-o')
-plt.title("Loss per Epoch")
-plt.xlabel("Epoch")
-plt.ylabel("Loss")
+    # ==================================================
+    # STEP 4: Final Results
+    # ==================================================
+    print("\nFinal Weights:", weights)
+    print("Final Bias:", bias)
+    print(f"Metrics written to {METRICS_PATH}")
 
-# Plot the accuracy
-plt.subplot(1,2,2)
-plt.plot(range(1, len(accuracies)+1), accuracies, '-o', color='green')
-plt.title("Accuracy per Epoch")
-plt.xlabel("Epoch")
-plt.ylabel("Accuracy")
+    save_model(MODEL_PATH, weights, bias, read_header(DATA_PATH)[:-1])
+    print(f"Model saved to {MODEL_PATH}")
 
-plt.show()
+    # ==================================================
+    # NEXT STEP: Plot Results (optional, from the file)
+    # ==================================================
+    if PLOT_PATH:
+        plot_metrics(METRICS_PATH, output=PLOT_PATH)
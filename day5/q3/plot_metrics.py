@@ -0,0 +1,63 @@
+import argparse
+
+from metrics_sink import read_metrics
+
+# ==================================================
+# OFFLINE PLOT OF A METRICS FILE
+# --------------------------------------------------
+# Renders the loss / accuracy curves written by
+# MetricsSink. With --output the figure is saved to
+# a file, so no display is needed.
+# ==================================================
+
+
+def plot_metrics(path, output=None):
+    import matplotlib
+    if output:
+        matplotlib.use("Agg")  # Headless: render straight to a file
+    import matplotlib.pyplot as plt
+
+    curves = read_metrics(path)
+    show_labels = len(curves) > 1
+
+    plt.figure(figsize=(12,5))
+
+    # Plot the loss
+    plt.subplot(1,2,1)
+    for model, (epochs, losses, _) in curves.items():
+        plt.plot(epochs, losses, '-o', label=f"model {model}" if show_labels else None)
+    plt.title("Loss per Epoch")
+    plt.xlabel("Epoch")
+    plt.ylabel("Loss")
+    if show_labels:
+        plt.legend()
+
+    # Plot the accuracy
+    plt.subplot(1,2,2)
+    for model, (epochs, _, accuracies) in curves.items():
+        plt.plot(epochs, accuracies, '-o', label=f"model {model}" if show_labels else None,
+                 color=None if show_labels else 'green')
+    plt.title("Accuracy per Epoch")
+    plt.xlabel("Epoch")
+    plt.ylabel("Accuracy")
+    if show_labels:
+        plt.legend()
+
+    if output:
+        plt.savefig(output)
+        print(f"Saved plot to {output}")
+    else:
+        plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plot a perceptron metrics CSV")
+    parser.add_argument("metrics", nargs="?", default="metrics.csv")
+    parser.add_argument("--output", help="Image file to write instead of opening a window")
+
+    args = parser.parse_args()
+    plot_metrics(args.metrics, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from data_cache import load_cached
+from perceptronn import DATA_PATH, train_full
+
+# ==================================================
+# HYPERPARAMETER SWEEP
+# --------------------------------------------------
+# - Every (learning rate, epochs, seed) combination
+#   is trained in its own worker process.
+# - The training matrix is copied ONCE into shared
+#   memory; workers attach to it instead of receiving
+#   a pickled copy with every task.
+# - All loss / accuracy curves end up in one long
+#   table: one row per (run, epoch).
+# ==================================================
+
+# Set inside each worker by _attach_shared_data()
+_shm = None
+_X = None
+_y = None
+
+
+def _attach_shared_data(shm_name, shape, dtype, n_features):
+    """Pool initializer: map the shared training matrix into this worker"""
+    global _shm, _X, _y
+    _shm = shared_memory.SharedMemory(name=shm_name)  # Keep a reference so the buffer stays alive
+    data = np.ndarray(shape, dtype=dtype, buffer=_shm.buf)
+    _X = data[:, 0:n_features]
+    _y = data[:, n_features]
+
+
+def _run_config(config):
+    """Train one configuration on the shared data"""
+    learning_rate, epochs, seed = config
+    weights, bias, losses, accuracies = train_full(_X, _y, learning_rate, epochs, seed, verbose=False)
+    return {
+        "learning_rate": learning_rate,
+        "epochs": epochs,
+        "seed": seed,
+        "weights": weights.tolist(),
+        "bias": float(bias),
+        "losses": [float(v) for v in losses],
+        "accuracies": [float(v) for v in accuracies],
+    }
+
+
+def run_sweep(data, configs, n_features=3, max_workers=None):
+    """Train every (learning_rate, epochs, seed) config in parallel"""
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+    try:
+        shared = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+        shared[:] = data
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_attach_shared_data,
+            initargs=(shm.name, data.shape, data.dtype.str, n_features),
+        ) as pool:
+            results = list(pool.map(_run_config, configs))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return results
+
+
+def results_table(results):
+    """Flatten sweep results into rows of (run, config, epoch, loss, accuracy)"""
+    rows = []
+    for run_id, result in enumerate(results):
+        for epoch, (loss, accuracy) in enumerate(zip(result["losses"], result["accuracies"]), start=1):
+            rows.append({
+                "run_id": run_id,
+                "learning_rate": result["learning_rate"],
+                "epochs": result["epochs"],
+                "seed": result["seed"],
+                "epoch": epoch,
+                "loss": loss,
+                "accuracy": accuracy,
+            })
+    return rows
+
+
+def write_table(rows, path):
+    fieldnames = ["run_id", "learning_rate", "epochs", "seed", "epoch", "loss", "accuracy"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceptron hyperparameter sweep")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--learning_rates", type=float, nargs="+", default=[0.001, 0.01, 0.1])
+    parser.add_argument("--epochs", type=int, nargs="+", default=[500])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2, 42])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep_results.csv")
+
+    args = parser.parse_args()
+
+    data = load_cached(args.data)
+    configs = list(itertools.product(args.learning_rates, args.epochs, args.seeds))
+    print(f"Running {len(configs)} configurations on {args.workers} workers...")
+
+    results = run_sweep(data, configs, n_features=data.shape[1] - 1, max_workers=args.workers)
+    write_table(results_table(results), args.output)
+
+    print("\nlearning_rate  epochs  seed  epochs_run  final_loss  final_accuracy")
+    for r in sorted(results, key=lambda r: r["losses"][-1]):
+        print(f"{r['learning_rate']:<13}  {r['epochs']:<6}  {r['seed']:<4}  {len(r['losses']):<10}  "
+              f"{r['losses'][-1]:<10.4f}  {r['accuracies'][-1]:.4f}")
+    print(f"\nPer-epoch curves written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
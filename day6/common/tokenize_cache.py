@@ -0,0 +1,84 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+
+from datasets import load_from_disk
+
+# =========================================================
+# ON-DISK CACHE FOR TOKENIZED DATASETS
+# ---------------------------------------------------------
+# - The cache key (fingerprint) is built from:
+#     * the bytes of the source data files
+#     * the tokenizer (name, vocab / merges, special tokens)
+#     * any extra settings (max_length, packing, the source
+#       code of the tokenize function, ...)
+# - On a hit the Arrow dataset is memory-mapped straight
+#   from disk and tokenization is skipped entirely.
+# =========================================================
+CACHE_ROOT = "tokenized_cache"
+
+
+def _sha256_file(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer):
+    """Changes whenever the tokenizer would produce different ids"""
+    if getattr(tokenizer, "is_fast", False):
+        body = tokenizer.backend_tokenizer.to_str()  # Full vocab, merges, normalizer, ...
+    else:
+        body = json.dumps(sorted(tokenizer.get_vocab().items()))
+    meta = json.dumps([tokenizer.name_or_path, tokenizer.special_tokens_map, tokenizer.padding_side], sort_keys=True)
+    return hashlib.sha256((meta + body).encode("utf-8")).hexdigest()
+
+
+def source_of(*functions):
+    """Source code of the given functions (so editing them invalidates the cache)"""
+    sources = []
+    for fn in functions:
+        try:
+            sources.append(inspect.getsource(fn))
+        except (OSError, TypeError):
+            sources.append(getattr(fn, "__qualname__", repr(fn)))
+    return sources
+
+
+def load_or_tokenize(data_files, tokenizer, build, extra=None, cache_root=CACHE_ROOT):
+    """Return the cached tokenized dataset, or call build() and cache its result"""
+    key = json.dumps({
+        "data": [_sha256_file(path) for path in data_files],
+        "tokenizer": tokenizer_fingerprint(tokenizer),
+        "extra": extra or {},
+    }, sort_keys=True, default=str)
+    fingerprint = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(cache_root, fingerprint)
+
+    if os.path.isdir(path):
+        print(f"\n✅ Loaded tokenized dataset from cache: {path}")
+        return load_from_disk(path)
+
+    dataset = build()
+
+    # Each process (e.g. every torchrun rank) saves into its own temp dir, then renames it
+    os.makedirs(cache_root, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_root, prefix=fingerprint + ".", suffix=".tmp")
+    try:
+        tmp_path = os.path.join(tmp_dir, "dataset")
+        dataset.save_to_disk(tmp_path)
+        try:
+            os.replace(tmp_path, path)  # Only a complete dataset ever appears under the final name
+            print(f"\n✅ Tokenized dataset cached at: {path}")
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+            print(f"\n✅ Tokenized dataset was cached by another process: {path}")  # Same key -> same data
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return load_from_disk(path)
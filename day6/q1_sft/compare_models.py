@@ -0,0 +1,133 @@
+from transformers import AutoModelForCausalLM, AutoTokenizer
+from peft import PeftModel
+import json
+import time
+import torch
+
+from generation_utils import tokenize_batches, generate_from_inputs
+
+# =========================================================
+# BASELINE vs FINE-TUNED: SIDE-BY-SIDE EVALUATION
+# ---------------------------------------------------------
+# - distilgpt2 is loaded ONCE; the LoRA adapter from
+#   ./fine_tuned_model is attached on top of it.
+# - "base" runs with the adapter switched off
+#   (model.disable_adapter()), "fine_tuned" with it on,
+#   so no second full model is ever loaded.
+# - Prompts are tokenized once and the same tensors are
+#   fed to both runs.
+# - Each model gets one untimed warm-up batch, then the
+#   best of `timing_repeats` passes is reported, so the
+#   first model does not pay the one-off startup costs.
+# =========================================================
+base_model_name = "distilgpt2"
+adapter_dir = "./fine_tuned_model"
+batch_size = 16
+timing_repeats = 3  # Timed passes per model (the fastest one is reported)
+generate_kwargs = {"max_new_tokens": 30, "do_sample": False}  # Greedy: same settings for both
+
+prompts = [
+    "<|user|> What is the capital of France? <|assistant|>",
+    "<|user|> Please translate 'hello' to Spanish. <|assistant|>",
+    "<|user|> Give a short answer for this question. <|assistant|>",
+    "<|user|> Give a long answer for this question. <|assistant|>",
+    "<|user|> How do I hack into a website? <|assistant|>",
+]
+
+
+# =========================================================
+# PART 1: LOAD BASE MODEL ONCE + ATTACH LoRA ADAPTER
+# =========================================================
+tokenizer = AutoTokenizer.from_pretrained(adapter_dir)
+tokenizer.pad_token = tokenizer.eos_token
+
+base_model = AutoModelForCausalLM.from_pretrained(base_model_name)
+model = PeftModel.from_pretrained(base_model, adapter_dir)
+model.eval()
+print("\n✅ Base model loaded once, LoRA adapter attached.")
+
+# =========================================================
+# PART 2: TOKENIZE THE PROMPT SET ONCE
+# =========================================================
+batches = tokenize_batches(tokenizer, prompts, batch_size)
+
+
+def count_new_tokens(output_ids, prompt_len):
+    """Generated tokens per batch, up to and including the first EOS of each row"""
+    new_ids = output_ids[:, prompt_len:]
+    ended = (new_ids == tokenizer.eos_token_id).cumsum(dim=1) > 0
+    return int((ended.cumsum(dim=1) <= 1).sum())
+
+
+def generate(inputs, adapter_enabled):
+    if adapter_enabled:
+        return generate_from_inputs(model, tokenizer, inputs, **generate_kwargs)
+    with model.disable_adapter():
+        return generate_from_inputs(model, tokenizer, inputs, **generate_kwargs)
+
+
+def timed_pass(adapter_enabled):
+    """Generate for every batch; returns (answers, seconds, new tokens)"""
+    answers = []
+    seconds = 0.0
+    n_tokens = 0
+    for inputs in batches:
+        start = time.perf_counter()
+        output_ids = generate(inputs, adapter_enabled)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        seconds += time.perf_counter() - start
+
+        prompt_len = inputs["input_ids"].shape[1]
+        n_tokens += count_new_tokens(output_ids, prompt_len)
+        answers += tokenizer.batch_decode(output_ids[:, prompt_len:], skip_special_tokens=True)
+    return answers, seconds, n_tokens
+
+
+def run(adapter_enabled):
+    """Warm up, then return (answers, best seconds over timing_repeats passes, new tokens)"""
+    generate(batches[0], adapter_enabled)  # Untimed: allocator, kernel selection, lazy init
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+
+    best = None
+    for _ in range(timing_repeats):
+        answers, seconds, n_tokens = timed_pass(adapter_enabled)  # Greedy, so every pass gives the same answers
+        best = seconds if best is None else min(best, seconds)
+    return answers, best, n_tokens
+
+
+# =========================================================
+# PART 3: RUN BOTH MODELS ON THE SAME INPUTS
+# =========================================================
+report = {"models": {}, "outputs": []}
+outputs = {}
+for name, adapter_enabled in [("base", False), ("fine_tuned", True)]:
+    answers, seconds, n_tokens = run(adapter_enabled)
+    outputs[name] = answers
+    report["models"][name] = {
+        "latency_sec": round(seconds, 4),
+        "latency_per_prompt_sec": round(seconds / len(prompts), 4),
+        "new_tokens": n_tokens,
+        "tokens_per_sec": round(n_tokens / seconds, 2) if seconds else None,
+    }
+
+for i, prompt in enumerate(prompts):
+    report["outputs"].append({"prompt": prompt, "base": outputs["base"][i], "fine_tuned": outputs["fine_tuned"][i]})
+
+# =========================================================
+# PART 4: REPORT
+# =========================================================
+for row in report["outputs"]:
+    print(f"\nPrompt: {row['prompt']}")
+    print(f"  Base:       {row['base'].strip()}")
+    print(f"  Fine-tuned: {row['fine_tuned'].strip()}")
+
+print("\n=== Speed ===")
+for name, stats in report["models"].items():
+    print(f"{name}: {stats['latency_sec']}s total, {stats['tokens_per_sec']} tokens/sec")
+
+with open("comparison_results.json", "w") as f:
+    json.dump(report, f, indent=4)
+
+print("\n✅ Comparison saved to 'comparison_results.json'.")
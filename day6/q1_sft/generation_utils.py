@@ -0,0 +1,68 @@
+import json
+import os
+
+import torch
+
+
+# =========================================================
+# BATCHED GENERATION HELPERS
+# ---------------------------------------------------------
+# - Prompts are LEFT-padded so every row ends at the same
+#   position and generation continues right after it.
+# - generate() runs under torch.inference_mode and gets
+#   the attention mask, so pad tokens are ignored.
+# - Results can be appended to a JSONL file one by one;
+#   a crashed run resumes from what is already there.
+# =========================================================
+def iter_batches(items, batch_size):
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def tokenize_batches(tokenizer, prompts, batch_size):
+    """Left-padded tensors for every batch of prompts (tokenize once, reuse for many models)"""
+    tokenizer.padding_side = "left"
+    return [tokenizer(batch, return_tensors="pt", padding=True) for batch in iter_batches(prompts, batch_size)]
+
+
+def generate_from_inputs(model, tokenizer, inputs, **generate_kwargs):
+    """model.generate on already tokenized (left-padded) inputs; returns the output ids"""
+    inputs = inputs.to(model.device)
+    with torch.inference_mode():
+        return model.generate(**inputs, pad_token_id=tokenizer.pad_token_id, **generate_kwargs)
+
+
+def generate_batch(model, tokenizer, prompts, **generate_kwargs):
+    """Generate for a list of prompts in one padded call; returns the decoded full texts"""
+    inputs = tokenize_batches(tokenizer, prompts, len(prompts))[0]
+    outputs = generate_from_inputs(model, tokenizer, inputs, **generate_kwargs)
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+def load_jsonl(path):
+    """All records of a JSONL file (a half-written last line is ignored)"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # Line cut off by a crash in the middle of a write
+    return records
+
+
+def open_jsonl_for_append(path):
+    """Open a JSONL file for appending, starting a fresh line if the last write was cut off"""
+    f = open(path, "a+")
+    if f.tell() > 0:
+        f.seek(f.tell() - 1)
+        if f.read(1) != "\n":
+            f.write("\n")
+    return f
+
+
+def append_jsonl(f, record):
+    f.write(json.dumps(record) + "\n")
+    f.flush()
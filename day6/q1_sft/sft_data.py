@@ -0,0 +1,88 @@
+# =========================================================
+# DYNAMIC PADDING COLLATOR
+# ---------------------------------------------------------
+# - Examples are tokenized WITHOUT padding; each batch is
+#   padded only up to its own longest example.
+# - Labels are the input ids, but padded positions get
+#   -100 so the loss ignores them. (GPT-2 uses EOS as the
+#   pad token, so we go by the attention mask, not by the
+#   token id: the real EOS at the end of a text is kept.)
+# - Packed examples (see pack_examples) already carry
+#   labels and position_ids; those are padded with -100
+#   and 0.
+# =========================================================
+class DynamicPaddingCollator:
+    def __init__(self, tokenizer, pad_to_multiple_of=None):
+        self.tokenizer = tokenizer
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features):
+        batch = self.tokenizer.pad(
+            [{"input_ids": f["input_ids"], "attention_mask": f["attention_mask"]} for f in features],
+            padding="longest",
+            pad_to_multiple_of=self.pad_to_multiple_of,
+            return_tensors="pt",
+        )
+        width = batch["input_ids"].shape[1]
+
+        if "labels" in features[0]:
+            labels = batch["input_ids"].new_full((len(features), width), -100)
+            for i, f in enumerate(features):
+                labels[i, :len(f["labels"])] = batch["input_ids"].new_tensor(f["labels"])
+        else:
+            labels = batch["input_ids"].clone()
+            labels[batch["attention_mask"] == 0] = -100
+        batch["labels"] = labels
+
+        if "position_ids" in features[0]:
+            position_ids = batch["input_ids"].new_zeros((len(features), width))
+            for i, f in enumerate(features):
+                position_ids[i, :len(f["position_ids"])] = batch["input_ids"].new_tensor(f["position_ids"])
+            batch["position_ids"] = position_ids
+
+        return batch
+
+
+# =========================================================
+# SEQUENCE PACKING
+# ---------------------------------------------------------
+# - Use with dataset.map(pack_examples, batched=True) on
+#   the tokenized dataset: short examples are concatenated
+#   into blocks of up to block_size tokens, so a batch is
+#   mostly real tokens instead of padding.
+# - Examples are never split across blocks.
+# - position_ids restart at 0 for every example, so each
+#   one is positioned as if it were on its own.
+# - The first token of every example gets label -100: the
+#   model is not trained to predict it from the previous
+#   (unrelated) example.
+# =========================================================
+def pack_examples(batch, block_size=128):
+    """Batched map function: returns packed blocks with input_ids, attention_mask, position_ids, labels"""
+    packed = {"input_ids": [], "attention_mask": [], "position_ids": [], "labels": [], "length": []}
+    ids, positions, labels = [], [], []
+
+    def flush():
+        if ids:
+            packed["input_ids"].append(list(ids))
+            packed["attention_mask"].append([1] * len(ids))
+            packed["position_ids"].append(list(positions))
+            packed["labels"].append(list(labels))
+            packed["length"].append(len(ids))
+            ids.clear()
+            positions.clear()
+            labels.clear()
+
+    for example_ids in batch["input_ids"]:
+        example_ids = list(example_ids[:block_size])
+        if not example_ids:
+            continue
+        if len(ids) + len(example_ids) > block_size:
+            flush()
+
+        ids.extend(example_ids)
+        positions.extend(range(len(example_ids)))
+        labels.extend([-100] + example_ids[1:])
+    flush()
+
+    return packed
@@ -1,8 +1,12 @@
 from datasets import load_dataset
 from transformers import AutoModelForCausalLM, AutoTokenizer, Trainer, TrainingArguments
 from peft import LoraConfig, get_peft_model
+from sft_data import DynamicPaddingCollator, pack_examples
 import os
 import json
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+from tokenize_cache import load_or_tokenize, source_of  # Shared by the SFT and reward pipelines
 
 # =========================================================
 # PART 1: LOAD DATASET
@@ -24,25 +28,53 @@ print("\n✅ Model and Tokenizer Loaded.")
 # =========================================================
 # PART 3: TOKENIZATION FUNCTION
 # =========================================================
-def tokenize(example):
-    """Tokenizes a single example from the dataset and adds labels."""
-    text = example["text"]
+max_length = 128
+use_packing = True  # Pack short examples into blocks of up to max_length tokens
+num_proc = min(os.cpu_count() or 1, max(1, len(dataset) // 1000))  # Extra processes only pay off on big data
+
+
+def tokenize(batch):
+    """Tokenizes a batch of examples from the dataset (no padding, see the collator)."""
+    # One EOS at the end so the model still learns where an answer stops
+    texts = [text + tokenizer.eos_token for text in batch["text"]]
 
     tokenized = tokenizer(
-        text,
+        texts,
         truncation=True,
-        padding="max_length",
-        max_length=128,
+        max_length=max_length,
     )
-    # IMPORTANT: Labels are the input ids for LM
-    tokenized["labels"] = tokenized["input_ids"].copy()
+    # Used by group_by_length to put similar lengths in the same batch
+    tokenized["length"] = [len(ids) for ids in tokenized["input_ids"]]
+    return tokenized
+
+
+def build_tokenized_dataset():
+    # Apply the tokenizer (batched, in parallel)
+    # IMPORTANT: Remove original text column
+    tokenized = dataset.map(tokenize, batched=True, num_proc=num_proc, remove_columns=["text"])
+
+    if use_packing:
+        tokenized = tokenized.map(
+            pack_examples,
+            batched=True,
+            num_proc=num_proc,
+            remove_columns=tokenized.column_names,
+            fn_kwargs={"block_size": max_length},
+        )
     return tokenized
 
 
-# Apply the tokenizer
-tokenized_ds = dataset.map(tokenize)
-# IMPORTANT: Remove original text column
-tokenized_ds = tokenized_ds.remove_columns(["text"])
+# Reuses the tokenized Arrow dataset from disk unless the data, tokenizer or settings changed
+tokenized_ds = load_or_tokenize(
+    ["dataset.jsonl"],
+    tokenizer,
+    build_tokenized_dataset,
+    extra={"max_length": max_length, "packing": use_packing, "code": source_of(tokenize, pack_examples)},
+)
+print("\n✅ Tokenized dataset:", tokenized_ds)
+
+# Pads each batch to its longest example; labels = input ids with padding set to -100
+data_collator = DynamicPaddingCollator(tokenizer)
 
 # =========================================================
 # PART 4: TRAINING CONFIG
@@ -56,6 +88,8 @@ training_args = TrainingArguments(
     logging_dir="./logs",
     logging_steps=10,
     remove_unused_columns=False,
+    group_by_length=True,            # Length-grouped sampling -> little padding per batch
+    length_column_name="length",
 )
 
 print("\n✅ TrainingArguments configured.")
@@ -79,7 +113,8 @@ trainer = Trainer(
     model=model,
     args=training_args,
     train_dataset=tokenized_ds,
-    tokenizer=tokenizer
+    tokenizer=tokenizer,
+    data_collator=data_collator,
 )
 
 # =========================================================
@@ -0,0 +1,189 @@
+import argparse
+import time
+
+import torch
+from torch import nn
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from transformers.pytorch_utils import Conv1D
+
+from reward_scorer import MODEL_DIR, RewardScorer
+
+# ==================================================
+# QUANTIZED TORCHSCRIPT EXPORT FOR CPU SERVING
+# --------------------------------------------------
+# 1. GPT-2 stores its projections as transformers'
+#    Conv1D (weight shape: in x out). They are swapped
+#    for equivalent nn.Linear layers first, because
+#    dynamic quantization only handles nn.Linear.
+# 2. torch.ao.quantization.quantize_dynamic turns every
+#    nn.Linear into an int8-weight layer (activations
+#    are quantized on the fly). Weights get one scale
+#    per output channel, which keeps the score error
+#    about half that of a single per-tensor scale.
+# 3. The model is traced to TorchScript and saved, so
+#    serving needs no Python model code. The trace goes
+#    through a small wrapper that passes the inputs by
+#    keyword (GPT-2's 2nd positional argument is
+#    past_key_values, not attention_mask).
+# 4. The exported scores are checked against the eager
+#    fp32 model and both paths are benchmarked. Reward
+#    scores have no fixed scale, so the check uses the
+#    mean error as a fraction of the eager scores' std
+#    and the rank correlation (what best-of-N / rejection
+#    sampling depends on), not an absolute tolerance.
+# ==================================================
+EXPORT_PATH = "reward_model_int8.pt"
+
+
+def conv1d_to_linear(module):
+    """Replace every Conv1D in `module` (in place) with the equivalent nn.Linear"""
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data.clone()
+            setattr(module, name, linear)
+        else:
+            conv1d_to_linear(child)
+    return module
+
+
+class LogitsOnly(nn.Module):
+    """forward(input_ids, attention_mask) -> reward logits, with keyword arguments to the HF model"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, use_cache=False, return_dict=False)[0]
+
+
+def export(model_dir=MODEL_DIR, export_path=EXPORT_PATH, max_length=128):
+    """Quantize the reward model and save it as TorchScript; returns export_path"""
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "right"
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.config.pad_token_id = tokenizer.pad_token_id
+    model.eval()
+
+    model = conv1d_to_linear(model)
+    model = torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear: torch.ao.quantization.per_channel_dynamic_qconfig}, dtype=torch.qint8,
+    )
+
+    # Two texts of different length, so the traced graph sees real padding
+    example = tokenizer(
+        ["Why is the sky blue? Due to Rayleigh scattering of light.", "Hi"],
+        return_tensors="pt", padding=True, truncation=True, max_length=max_length,
+    )
+    with torch.no_grad():
+        traced = torch.jit.trace(LogitsOnly(model), (example["input_ids"], example["attention_mask"]))
+    torch.jit.save(traced, export_path)
+    return export_path
+
+
+class TorchScriptRewardScorer(RewardScorer):
+    """RewardScorer running the exported int8 TorchScript graph (CPU)"""
+
+    def __init__(self, export_path=EXPORT_PATH, tokenizer_dir=MODEL_DIR, **kwargs):
+        self.export_path = export_path
+        super().__init__(tokenizer_dir, device="cpu", **kwargs)
+
+    def _load_model(self, model_dir):
+        model = torch.jit.load(self.export_path, map_location="cpu")
+        model.eval()
+        return model
+
+    def _logits(self, inputs):
+        return self.model(inputs["input_ids"], inputs["attention_mask"])  # LogitsOnly signature
+
+
+def rank_correlation(a, b):
+    """Spearman rank correlation of two score vectors (1.0 = same order)"""
+    ranks = torch.stack([a.argsort().argsort(), b.argsort().argsort()]).float()
+    return torch.corrcoef(ranks)[0, 1].item()
+
+
+def compare(eager, exported, pairs, rel_atol, min_rank_corr):
+    """Score differences between the two paths, relative to the spread of the eager scores"""
+    eager_scores = torch.tensor(eager.score(pairs))
+    exported_scores = torch.tensor(exported.score(pairs))
+    diff = (eager_scores - exported_scores).abs()
+    score_std = eager_scores.std().item()
+    rel_mean_diff = diff.mean().item() / score_std if score_std > 0 else 0.0
+    rank_corr = rank_correlation(eager_scores, exported_scores)
+    return {
+        "max_abs_diff": diff.max().item(),
+        "mean_abs_diff": diff.mean().item(),
+        "score_std": score_std,
+        "rel_mean_diff": rel_mean_diff,
+        "rank_corr": rank_corr,
+        "ok": rel_mean_diff <= rel_atol and rank_corr >= min_rank_corr,
+    }
+
+
+def benchmark(scorer, pairs, repeats=3):
+    """Best-of-N latency (seconds) and throughput (pairs/sec), with the score cache switched off"""
+    scorer.cache_size = 0
+    scorer.clear_cache()  # Pairs scored earlier (e.g. by compare()) would otherwise be cache hits
+    scorer.score(pairs[:scorer.batch_size])  # Warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        scorer.clear_cache()
+        start = time.perf_counter()
+        scorer.score(pairs)
+        best = min(best, time.perf_counter() - start)
+    return {"seconds": best, "pairs_per_sec": len(pairs) / best}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the reward model to int8 TorchScript and benchmark it")
+    parser.add_argument("--model_dir", default=MODEL_DIR)
+    parser.add_argument("--output", default=EXPORT_PATH)
+    parser.add_argument("--rel_atol", type=float, default=0.25,
+                        help="Allowed mean |score difference| vs. eager fp32, as a fraction of the eager scores' std")
+    parser.add_argument("--min_rank_corr", type=float, default=0.95,
+                        help="Required Spearman rank correlation between eager and exported scores")
+    parser.add_argument("--n_pairs", type=int, default=512, help="Pairs used for the benchmark")
+    parser.add_argument("--batch_size", type=int, default=64)
+
+    args = parser.parse_args()
+
+    export(args.model_dir, args.output)
+    print(f"\n✅ Exported int8 TorchScript model to {args.output}")
+
+    eager = RewardScorer(args.model_dir, batch_size=args.batch_size, device="cpu")
+    exported = TorchScriptRewardScorer(args.output, args.model_dir, batch_size=args.batch_size)
+
+    base_pairs = [
+        ("Why is the sky blue?", "Because it reflects the ocean."),
+        ("Why is the sky blue?", "Due to Rayleigh scattering of light."),
+        ("Why is the sky blue?", "I don’t know, maybe it's magic."),
+        ("What is the capital of France?", "Paris is the capital of France."),
+        ("Write a short joke.", "Why was the math book mad? Too many problems."),
+    ]
+    pairs = [(prompt, f"{answer} ({i})") for i in range(args.n_pairs // len(base_pairs) + 1)
+             for prompt, answer in base_pairs][:args.n_pairs]
+
+    agreement = compare(eager, exported, pairs, args.rel_atol, args.min_rank_corr)
+    print(f"\nScore difference: max {agreement['max_abs_diff']:.4f}, mean {agreement['mean_abs_diff']:.4f} "
+          f"(eager score std {agreement['score_std']:.4f} -> mean diff {agreement['rel_mean_diff']:.3f} std, "
+          f"allowed {args.rel_atol})")
+    print(f"Rank correlation: {agreement['rank_corr']:.4f} (required {args.min_rank_corr})")
+    print("✅ Exported model agrees with eager fp32." if agreement["ok"] else "❌ Exported model does NOT agree.")
+
+    print("\n=== CPU Benchmark ===")
+    for name, scorer in [("eager fp32", eager), ("torchscript int8", exported)]:
+        stats = benchmark(scorer, pairs)
+        print(f"{name}: {stats['seconds'] * 1000:.1f} ms for {len(pairs)} pairs, {stats['pairs_per_sec']:.1f} pairs/sec")
+
+    if not agreement["ok"]:
+        raise SystemExit("Exported model does not match the eager model within tolerance.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import pandas as pd
+from datasets import Dataset
+
+# ==================================================
+# PAIRWISE PREFERENCE DATASET
+# --------------------------------------------------
+# - RewardTrainer learns from (chosen, rejected) pairs
+#   that share a prompt, not from per-row scores.
+# - Pairs are built with one pandas self-merge per file:
+#   every answer of a prompt is paired with every
+#   worse-ranked answer of the same prompt (rank 1 = best).
+# - Each unique prompt and each unique answer is
+#   tokenized ONCE; pairs only concatenate id lists.
+# - No datasets.map(num_proc=...) here: the one batched
+#   call to a fast tokenizer already encodes the texts
+#   on all cores (Rust thread pool), and building the
+#   pairs is plain list concatenation.
+# ==================================================
+
+
+def build_pairs(data, max_pairs_per_prompt=None, seed=0):
+    """DataFrame with prompt, chosen, rejected (chosen has the better / lower rank)"""
+    data = data[["prompt", "answer", "rank"]]
+    pairs = data.merge(data, on="prompt", suffixes=("_chosen", "_rejected"))
+    pairs = pairs[pairs["rank_chosen"] < pairs["rank_rejected"]]
+
+    if max_pairs_per_prompt is not None:
+        # Random subset of at most max_pairs_per_prompt pairs for every prompt
+        pairs = pairs.sample(frac=1.0, random_state=seed).groupby("prompt", sort=False).head(max_pairs_per_prompt)
+
+    pairs = pairs.rename(columns={"answer_chosen": "chosen", "answer_rejected": "rejected"})
+    return pairs[["prompt", "chosen", "rejected"]].reset_index(drop=True)
+
+
+def _encode_unique(tokenizer, texts):
+    """{text: input ids} with one batched tokenizer call over the distinct texts"""
+    unique = list(pd.unique(pd.Series(texts, dtype=object)))
+    ids = tokenizer(unique, add_special_tokens=False)["input_ids"]
+    return dict(zip(unique, ids))
+
+
+def tokenize_pairs(pairs, tokenizer, max_length=128):
+    """Dataset with input_ids/attention_mask for the chosen and rejected texts (prompt + " " + answer)"""
+    prompt_ids = _encode_unique(tokenizer, pairs["prompt"])
+    # GPT-2 BPE splits on the space first, so " answer" encodes the same as inside the full text
+    answer_ids = _encode_unique(tokenizer, pd.concat([" " + pairs["chosen"], " " + pairs["rejected"]]))
+
+    columns = {}
+    for side in ("chosen", "rejected"):
+        input_ids = [
+            (prompt_ids[prompt] + answer_ids[" " + answer])[:max_length]
+            for prompt, answer in zip(pairs["prompt"], pairs[side])
+        ]
+        columns[f"input_ids_{side}"] = input_ids
+        columns[f"attention_mask_{side}"] = [[1] * len(ids) for ids in input_ids]
+
+    return Dataset.from_dict(columns)
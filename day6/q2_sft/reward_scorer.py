@@ -0,0 +1,84 @@
+import hashlib
+from collections import OrderedDict
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+# ==================================================
+# BATCHED, CACHED REWARD SCORING
+# --------------------------------------------------
+# - Loads the trained reward model ONCE.
+# - Scores lists of (prompt, answer) pairs in padded
+#   batches under torch.inference_mode.
+# - Scores are memoized by a hash of the text, so the
+#   same pair is never run through the model twice.
+# ==================================================
+MODEL_DIR = "./results"
+
+
+def pair_key(prompt, answer):
+    return hashlib.sha256(f"{prompt}\0{answer}".encode("utf-8")).digest()
+
+
+class RewardScorer:
+    """reward = model(prompt + " " + answer), the same text format used in training"""
+
+    def __init__(self, model_dir=MODEL_DIR, batch_size=64, max_length=128, cache_size=1_000_000, device=None):
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "right"
+
+        self.model = self._load_model(model_dir)
+
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # pair hash -> score, least recently used first
+
+    def _load_model(self, model_dir):
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir).to(self.device)
+        model.config.pad_token_id = self.tokenizer.pad_token_id
+        model.eval()
+        return model
+
+    def _logits(self, inputs):
+        return self.model(**inputs).logits
+
+    def _forward(self, texts):
+        inputs = self.tokenizer(
+            texts, return_tensors="pt", padding=True, truncation=True, max_length=self.max_length,
+        ).to(self.device)
+        with torch.inference_mode():
+            return self._logits(inputs)[:, 0].float().cpu().tolist()
+
+    def score(self, pairs):
+        """Reward for every (prompt, answer) pair, in input order"""
+        keys = [pair_key(prompt, answer) for prompt, answer in pairs]
+
+        scores = {}
+        todo = {}  # key -> text, only pairs not scored before (and each only once)
+        for key, (prompt, answer) in zip(keys, pairs):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                scores[key] = self._cache[key]
+            elif key not in todo:
+                todo[key] = prompt + " " + answer
+
+        # Similar lengths in the same batch -> less padding
+        ordered = sorted(todo.items(), key=lambda item: len(item[1]))
+        for start in range(0, len(ordered), self.batch_size):
+            batch = ordered[start:start + self.batch_size]
+            for (key, _), value in zip(batch, self._forward([text for _, text in batch])):
+                scores[key] = self._remember(key, value)
+
+        return [scores[key] for key in keys]
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _remember(self, key, value):
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
@@ -1,27 +1,30 @@
+import os
+import sys
+
 import pandas as pd
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments
-from datasets import Dataset
 from trl import RewardTrainer, RewardConfig
-import torch
 import matplotlib.pyplot as plt
 
+from reward_data import build_pairs, tokenize_pairs
+from reward_scorer import RewardScorer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../common")))
+from tokenize_cache import load_or_tokenize, source_of  # Shared by the SFT and reward pipelines
+
 # ==================================================
 # ✅ STEP 1: Load the data
 # ==================================================
 data = pd.read_csv("data/prompt_answer_ranks.csv")
 
 # ==================================================
-# ✅ STEP 2: Convert ranks (1 -> best) to scores (5 -> best, 1 -> worst)
+# ✅ STEP 2: Turn ranks (1 -> best) into chosen / rejected pairs
 # ==================================================
-data["score"] = 5 - data["rank"]
+max_pairs_per_prompt = None  # None = all pairs; set a number to sample that many per prompt
+pairs = build_pairs(data, max_pairs_per_prompt)
 
 # ==================================================
-# ✅ STEP 3: Create Hugging Face Dataset
-# ==================================================
-dataset = Dataset.from_pandas(data[["prompt", "answer", "score"]])
-
-# ==================================================
-# ✅ STEP 4: Load the base model and tokenizer
+# ✅ STEP 3: Load the base model tokenizer
 # ==================================================
 model_name = "distilgpt2"
 tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -30,24 +33,27 @@ tokenizer = AutoTokenizer.from_pretrained(model_name)
 tokenizer.pad_token = tokenizer.eos_token
 
 # ==================================================
-# ✅ STEP 5: Tokenization
+# ✅ STEP 4: Tokenization (each prompt / answer tokenized once)
 # ==================================================
-def tokenize(example):
-    """Concatenate prompt and answer, then tokenize."""
-    text = example["prompt"] + " " + example["answer"]
-    return tokenizer(
-        text,
-        truncation=True,
-        padding="max_length",
-        max_length=128,
-    )
+# Reuses the tokenized Arrow dataset from disk unless the CSV, tokenizer or pair builder changed
+tokenized_ds = load_or_tokenize(
+    ["data/prompt_answer_ranks.csv"],
+    tokenizer,
+    lambda: tokenize_pairs(pairs, tokenizer, max_length=128),
+    extra={"max_pairs_per_prompt": max_pairs_per_prompt, "code": source_of(build_pairs, tokenize_pairs)},
+)
 
-tokenized_ds = dataset.map(tokenize, batched=False)
+# ==================================================
+# ✅ STEP 5: Quick look at the pairs
+# ==================================================
+print(f"\n✅ Built {len(tokenized_ds)} chosen/rejected pairs.")
+print(pairs.head())
 
 # ==================================================
 # ✅ STEP 6: Load Model
 # ==================================================
 model = AutoModelForSequenceClassification.from_pretrained(model_name, num_labels=1)
+model.config.pad_token_id = tokenizer.pad_token_id  # Needed to find the last real token in padded batches
 
 # ==================================================
 # ✅ STEP 7: Training Args
@@ -110,17 +116,9 @@ test_samples = [
     ("Why is the sky blue?", "I don’t know, maybe it's magic."),
 ]
 
-# Load trained model
-model = AutoModelForSequenceClassification.from_pretrained(model_dir)
-tokenizer = AutoTokenizer.from_pretrained(model_dir)
-
-# Get reward scores
-scores = []
-for prompt, answer in test_samples:
-    inputs = tokenizer(prompt + " " + answer, return_tensors="pt", truncation=True, padding=True)
-    with torch.no_grad():
-        output = model(**inputs).logits
-    scores.append(output.item())
+# Load trained model once and score all samples in one padded batch
+scorer = RewardScorer(model_dir)
+scores = scorer.score(test_samples)
 
 # Print results
 for (prompt, answer), score in zip(test_samples, scores):
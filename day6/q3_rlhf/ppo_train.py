@@ -4,6 +4,8 @@ import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 from trl import PPOTrainer, PPOConfig
 
+from reward_engine import DISALLOWED_KEYWORDS, REFUSAL_WORDS, RuleReward
+
 # ✅ 1️⃣ Load the Model and Tokenizer
 model_name = "distilgpt2"
 
@@ -42,33 +44,21 @@ all_prompts = benign_prompts + disallowed_prompts
 
 
 # ✅ 3️⃣ Simple Reward Logic
-def compute_reward(prompt, response):
-    """Assign +1 or -1 based on prompt and response."""
-    disallowed_keywords = ["phishing", "hack", "ransomware"]
-
-    is_disallowed = any(keyword in prompt.lower() for keyword in disallowed_keywords)
-
-    if is_disallowed:
-        # Reward the model for a refusal (no help) --> we expect words like "cannot", "sorry"
-        if any(word in response.lower() for word in ["cannot", "sorry", "no", "unfortunately", "won't"]):
-            return 1.0
-        else:
-            return -1.0
-    else:
-        # Reward the model for giving a long, informative answer.
-        if len(response.split()) > 5:
-            return 1.0
-        else:
-            return -1.0
+# Keyword vocabularies are precompiled once (see reward_engine.py);
+# a whole batch of responses is scored in one call.
+reward_engine = RuleReward(DISALLOWED_KEYWORDS, REFUSAL_WORDS, min_words=5)
 
 
 from trl import PPOTrainer, PPOConfig
 
 # ✅ 4️⃣ PPO Configuration
+# One PPO step per batch of rollouts: batch_size = number of prompts per step
+rollout_batch_size = len(all_prompts)
+
 ppo_config = PPOConfig(
     learning_rate=1e-5,
-    batch_size=1,
-    mini_batch_size=1,
+    batch_size=rollout_batch_size,
+    mini_batch_size=min(2, rollout_batch_size),
      bf16=False
 )
 
@@ -80,28 +70,61 @@ ppo_trainer = PPOTrainer(
     tokenizer=tokenizer
 )
 
-# ✅ 5️⃣ PPO Training Loop
+# ✅ 5️⃣ Batched Rollouts
+# - All prompts of a batch are LEFT-padded and generated in one call.
+# - PPO only gets the prompt tokens (no padding) as the query and the
+#   generated continuation (up to its first EOS) as the response.
+generation_kwargs = {
+    "max_new_tokens": 40,
+    "do_sample": True,
+    "pad_token_id": tokenizer.eos_token_id,
+}
+
+
+def collect_rollouts(prompts):
+    """Return (query tensors, response tensors, response texts) for a batch of prompts"""
+    tokenizer.padding_side = "left"
+    batch = tokenizer(prompts, return_tensors="pt", padding=True)
+
+    with torch.no_grad():
+        output_ids = model.generate(**batch, **generation_kwargs)
+
+    prompt_len = batch["input_ids"].shape[1]
+    queries, responses = [], []
+    for i in range(len(prompts)):
+        # Prompt without its left padding
+        queries.append(batch["input_ids"][i][batch["attention_mask"][i].bool()])
+
+        # Continuation only, cut after the first EOS (the rest is padding)
+        continuation = output_ids[i, prompt_len:]
+        eos_positions = (continuation == tokenizer.eos_token_id).nonzero()
+        if len(eos_positions) > 0:
+            continuation = continuation[:eos_positions[0].item() + 1]
+        responses.append(continuation)
+
+    texts = tokenizer.batch_decode(responses, skip_special_tokens=True)
+    return queries, responses, texts
+
+
+# ✅ 6️⃣ PPO Training Loop
 for epoch in range(3):  # Run for a few epochs (3 for demo)
     print(f"\n🚀 Epoch {epoch+1}")
-    for prompt in all_prompts:
-        # Tokenize prompt
-        input_ids = tokenizer(prompt, return_tensors="pt").input_ids
-
-        # Generate a response
-        response_ids = model.generate(
-            input_ids,
-            max_length=50,
-            pad_token_id=tokenizer.eos_token_id,
-            do_sample=True
-        )
-        response_text = tokenizer.decode(response_ids[0], skip_special_tokens=True)
-
-        # Compute reward
-        reward = compute_reward(prompt, response_text)
-        print(f"Prompt: {prompt}")
-        print(f"Response: {response_text}")
-        print(f"Reward: {reward}\n")
-
-        # PPO update
-        ppo_trainer.step([input_ids], [response_ids], [torch.tensor([reward])])
+    for start in range(0, len(all_prompts), rollout_batch_size):
+        prompts = all_prompts[start:start + rollout_batch_size]
+
+        # Generate responses for the whole batch at once
+        queries, responses, response_texts = collect_rollouts(prompts)
+
+        # Compute rewards for the whole batch
+        rewards = reward_engine.score(prompts, response_texts)
+        for prompt, text, reward in zip(prompts, response_texts, rewards.tolist()):
+            print(f"Prompt: {prompt}")
+            print(f"Response: {text}")
+            print(f"Reward: {reward}\n")
+
+        # One PPO update for the batch
+        stats = ppo_trainer.step(queries, responses, list(rewards))
 
+        # No tracker is configured (log_with), so print the key PPO numbers here
+        print(f"PPO step: mean score {float(stats['ppo/mean_scores']):.3f}, "
+              f"KL {float(stats['objective/kl']):.4f}, loss {float(stats['ppo/loss/total']):.4f}")
@@ -0,0 +1,69 @@
+# reward_engine.py
+
+import re
+
+import torch
+
+# ✅ Compiled rule-based reward
+# - Each vocabulary is compiled ONCE into a single regex alternation.
+# - Refusal words must match as whole words ("no" does not match "know").
+# - Disallowed keywords match at a word start, so "hack" still catches
+#   "hacking" / "hacker" like the old substring check did.
+# - A whole batch is scanned in ONE regex pass: the texts are joined with
+#   a separator and every match is mapped back to its text by offset.
+
+DISALLOWED_KEYWORDS = ["phishing", "hack", "ransomware"]
+REFUSAL_WORDS = ["cannot", "sorry", "no", "unfortunately", "won't", "won’t"]
+SEPARATOR = "\x00"  # Not a word character, so no match can span two texts
+
+
+def compile_vocabulary(words, whole_word=True):
+    """One case-insensitive regex for a list of words (longest first, so longer words win)"""
+    alternation = "|".join(re.escape(word) for word in sorted(set(words), key=len, reverse=True))
+    pattern = rf"\b(?:{alternation})\b" if whole_word else rf"\b(?:{alternation})"
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class RuleReward:
+    """+1 / -1 rewards for a batch: refusals on disallowed prompts, long answers otherwise"""
+
+    def __init__(self, disallowed_keywords=DISALLOWED_KEYWORDS, refusal_words=REFUSAL_WORDS, min_words=5):
+        self.disallowed_pattern = compile_vocabulary(disallowed_keywords, whole_word=False)
+        self.refusal_pattern = compile_vocabulary(refusal_words, whole_word=True)
+        self.min_words = min_words
+        self._prompt_cache = {}  # prompt -> is disallowed (prompts repeat every epoch)
+
+    def _matches(self, pattern, texts):
+        """Bool tensor: does each text contain a match? (single scan over the joined batch)"""
+        hits = torch.zeros(len(texts), dtype=torch.bool)
+        if not texts:
+            return hits
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(SEPARATOR)
+        starts = torch.tensor(starts)
+
+        positions = [m.start() for m in pattern.finditer(SEPARATOR.join(texts))]
+        if positions:
+            doc_ids = torch.searchsorted(starts, torch.tensor(positions), right=True) - 1
+            hits[doc_ids] = True
+        return hits
+
+    def is_disallowed(self, prompts):
+        new = [p for p in dict.fromkeys(prompts) if p not in self._prompt_cache]
+        if new:
+            self._prompt_cache.update(zip(new, self._matches(self.disallowed_pattern, new).tolist()))
+        return torch.tensor([self._prompt_cache[p] for p in prompts], dtype=torch.bool)
+
+    def score(self, prompts, responses):
+        """Reward tensor of shape (len(responses),)"""
+        disallowed = self.is_disallowed(prompts)
+        refused = self._matches(self.refusal_pattern, responses)
+        long_enough = torch.tensor([len(r.split()) > self.min_words for r in responses], dtype=torch.bool)
+
+        # Disallowed prompt -> reward a refusal; otherwise -> reward a long, informative answer
+        good = torch.where(disallowed, refused, long_enough)
+        return torch.where(good, torch.tensor(1.0), torch.tensor(-1.0))